@@ -22,8 +22,8 @@ def example_1_basic_usage():
     config = load_config()
     
     # 修改配置（如果需要）
-    config._config['paths']['input_file'] = 'input/my_video.mp4'
-    config._config['paths']['output_ass'] = 'output/my_subtitle.ass'
+    config.set('paths.input_file', 'input/my_video.mp4')
+    config.set('paths.output_ass', 'output/my_subtitle.ass')
     
     # 创建生成器并运行
     generator = ASSGenerator(config)
@@ -125,28 +125,21 @@ def example_5_ass_generation():
     print("示例5：生成ASS文件")
     print("=" * 60)
     
-    from util import ASSWriter, seconds_to_ass_time
-    
-    # 准备时间戳数据（秒）
-    timestamps_seconds = [
-        {'start': 0.5, 'end': 3.2},
-        {'start': 4.1, 'end': 7.8},
-        {'start': 9.0, 'end': 12.5}
-    ]
+    import numpy as np
+    from util import ASSWriter
     
-    # 转换为ASS格式
-    timestamps_ass = []
-    for ts in timestamps_seconds:
-        timestamps_ass.append({
-            'start': seconds_to_ass_time(ts['start']),
-            'end': seconds_to_ass_time(ts['end'])
-        })
+    # 准备时间戳数据（秒），每行为 [start, end]
+    timestamps_seconds = np.array([
+        [0.5, 3.2],
+        [4.1, 7.8],
+        [9.0, 12.5]
+    ])
     
-    # 写入ASS文件
+    # 写入ASS文件（秒数数组会被批量转换为ASS时间格式）
     output_path = 'output/example.ass'
     ASSWriter.write_ass_file(
         output_path,
-        timestamps_ass,
+        timestamps_seconds,
         title="示例字幕",
         resolution=(1920, 1080)
     )
@@ -238,9 +231,9 @@ def example_7_batch_processing():
         config = load_config()
         
         # 设置输入输出路径
-        config._config['paths']['input_file'] = str(video_file)
-        config._config['paths']['output_ass'] = f"output/{video_file.stem}.ass"
-        config._config['paths']['output_wav'] = f"output/{video_file.stem}.wav"
+        config.set('paths.input_file', str(video_file))
+        config.set('paths.output_ass', f"output/{video_file.stem}.ass")
+        config.set('paths.output_wav', f"output/{video_file.stem}.wav")
         
         # 生成字幕
         generator = ASSGenerator(config)
@@ -0,0 +1,35 @@
+"""
+数据类别推断
+根据文件名和所在目录名中的关键词推断样本类别，供各实验共用
+"""
+from pathlib import Path
+
+
+# (类别, 文件名关键词, 目录名关键词)，按优先级排列，命中第一个即返回
+CATEGORY_KEYWORDS = (
+    ('live', ('live',), ('live',)),
+    ('interview', ('interview', '访谈'), ('interview',)),
+    ('radio', ('radio', '电台'), ('radio',)),
+    ('anime', ('anime', '动画'), ('anime',)),
+)
+
+
+def infer_category(path: Path) -> str:
+    """
+    从文件名或路径推断类别
+    
+    Args:
+        path: 音频或字幕文件路径
+        
+    Returns:
+        str: 类别名，未命中任何关键词时为 'other'
+    """
+    path = Path(path)
+    name_lower = path.stem.lower()
+    parent_lower = path.parent.name.lower()
+    
+    for category, name_keywords, parent_keywords in CATEGORY_KEYWORDS:
+        if (any(keyword in name_lower for keyword in name_keywords)
+                or any(keyword in parent_lower for keyword in parent_keywords)):
+            return category
+    return 'other'
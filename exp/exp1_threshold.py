@@ -11,24 +11,132 @@
 
 注意：此实验使用pre_process，模拟实际使用场景（与src/main.py一致）
 """
+import asyncio
+import os
 import sys
 from pathlib import Path
-import json
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 from tqdm import tqdm
 
+# 实验只保存图片，使用非交互后端，避免探测GUI后端
+matplotlib.use('Agg')
+
 # 添加模块路径
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from subtitle_parser import SubtitleParser
-from vad_analyzer import VADAnalyzer, SILERO_AVAILABLE, extract_audio_from_video
+from category import infer_category
+from result_io import save_results_json
+from vad_analyzer import VADAnalyzer, VADResultCache, SILERO_AVAILABLE
 from metrics import evaluate_vad_performance
 
 # 从src导入pre_process函数
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-from util import pre_process
+from util import AudioExtractor, pre_process
+from vad import probs_to_timestamps, quantize_speech_probs, threshold_on_prob_grid, timestamps_to_array
+
+
+# 单次FFmpeg调用最多处理的视频数
+EXTRACT_BATCH_SIZE = 8
+
+# VAD批量推理时同时处理的音频数
+VAD_BATCH_SIZE = 8
+
+
+async def _extract_batch(video_paths: list, audio_paths: list, extractor: AudioExtractor,
+                         semaphore: asyncio.Semaphore, pbar: tqdm) -> list:
+    """
+    在一次FFmpeg调用中提取一组视频的音频
+    
+    批量提取失败时（例如其中某个文件没有音轨），退回到逐个提取，
+    以便其余文件仍能成功
+    
+    Args:
+        video_paths: 视频路径列表
+        audio_paths: 音频输出路径列表
+        extractor: 音频提取器
+        semaphore: 限制同时运行的FFmpeg进程数
+        pbar: 进度条
+        
+    Returns:
+        list: [(视频路径, 是否成功), ...]
+    """
+    async with semaphore:
+        try:
+            await extractor.extract_audio_batch_async(video_paths, audio_paths)
+            results = [(video_path, True) for video_path in video_paths]
+        except Exception as e:
+            print(f"批量音频提取失败: {e}")
+            results = []
+            for video_path, audio_path in zip(video_paths, audio_paths):
+                try:
+                    success = await extractor.extract_audio_batch_async([video_path], [audio_path])
+                except Exception as e:
+                    print(f"音频提取失败: {e}")
+                    success = False
+                results.append((video_path, success))
+    
+    pbar.update(len(video_paths))
+    return results
+
+
+async def _extract_all(tasks: list, ffmpeg_path: str, max_concurrency: int, pbar: tqdm) -> list:
+    """
+    并发运行所有批量提取任务
+    
+    Args:
+        tasks: [(视频路径列表, 音频输出路径列表), ...]
+        ffmpeg_path: FFmpeg可执行文件路径
+        max_concurrency: 同时运行的FFmpeg进程数上限
+        pbar: 进度条
+        
+    Returns:
+        list: 每个任务的 [(视频路径, 是否成功), ...]
+    """
+    extractor = AudioExtractor(ffmpeg_path=ffmpeg_path)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    return await asyncio.gather(*(
+        _extract_batch(video_paths, audio_paths, extractor, semaphore, pbar)
+        for video_paths, audio_paths in tasks
+    ))
+
+
+def _evaluate_file(task: tuple) -> tuple:
+    """
+    评估单个样本在所有threshold下的VAD性能（供进程池调用）
+    
+    每个样本的语音概率只需传给子进程一次，在子进程内遍历所有threshold
+    
+    Args:
+        task: (样本, 真实时间戳, 语音概率, 音频样本数, threshold列表, VAD参数, 预处理配置, IoU阈值)
+        
+    Returns:
+        tuple: (样本, 每个threshold的评估指标列表, 错误信息)
+            成功时错误信息为None，失败时评估指标列表为None
+    """
+    (item, gt_timestamps, speech_probs, audio_length_samples,
+     thresholds, vad_params, config, iou_threshold) = task
+    try:
+        file_metrics = []
+        for threshold in thresholds:
+            # 使用当前threshold对缓存的语音概率做后处理，生成VAD结果；
+            # 与src/main.py一样在VAD出口一次性转换为 (N, 2) 数组，之后全程使用数组
+            vad_timestamps = timestamps_to_array(probs_to_timestamps(
+                speech_probs, audio_length_samples, threshold=threshold, **vad_params))
+            
+            # 预处理时间戳（与src/main.py保持一致）
+            # 调整间隔过小的语音片段
+            pred_timestamps = pre_process(vad_timestamps, config=config)
+            
+            # 评估性能
+            file_metrics.append(evaluate_vad_performance(pred_timestamps, gt_timestamps, iou_threshold))
+        
+        return item, file_metrics, None
+    except Exception as e:
+        return item, None, str(e)
 
 
 class SimpleConfig:
@@ -40,7 +148,8 @@ class SimpleConfig:
 class ThresholdExperiment:
     """threshold参数优化实验"""
     
-    def __init__(self, data_dir: str, results_dir: str, merge_min_gap: float = 0.5, ffmpeg_path: str = None):
+    def __init__(self, data_dir: str, results_dir: str, merge_min_gap: float = 0.5, ffmpeg_path: str = None,
+                 vad_cache: VADResultCache = None):
         """
         初始化实验
         
@@ -49,6 +158,7 @@ class ThresholdExperiment:
             results_dir: 结果输出目录
             merge_min_gap: 最小间隔（秒），用于预处理时间戳
             ffmpeg_path: FFmpeg可执行文件路径，如果为None则尝试从配置文件读取
+            vad_cache: 与其他实验共用的VAD结果缓存，为None时使用results_dir/vad_cache
         """
         self.data_dir = Path(data_dir)
         self.results_dir = Path(results_dir)
@@ -61,6 +171,19 @@ class ThresholdExperiment:
         self.parser = SubtitleParser()
         self.config = SimpleConfig(merge_min_gap=merge_min_gap)
         
+        # 每个音频文件的语音概率缓存 {音频路径: (量化后的uint8概率数组, 音频样本数)}
+        # 模型推理只与音频有关，不同threshold只需重新做后处理；
+        # threshold为0.01的整数倍时，按0.01量化不影响比较结果，内存只需float32的1/4
+        self._probs_cache = {}
+        # 有threshold不在量化刻度上时使用的原始float32语音概率，格式同上
+        self._float_probs_cache = {}
+        
+        # 真实字幕时间戳缓存 {字幕路径: 时间戳列表}
+        self._gt_cache = {}
+        
+        # 语音概率的磁盘缓存，重复运行实验时跳过模型推理；实验3也可直接复用其中的语音概率
+        self.vad_cache = vad_cache if vad_cache is not None else VADResultCache(self.results_dir / 'vad_cache')
+        
         # 尝试从主配置文件读取ffmpeg_path
         if ffmpeg_path is None:
             try:
@@ -84,15 +207,21 @@ class ThresholdExperiment:
         # 遍历数据目录，查找视频和字幕对
         video_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv']
         
-        for video_file in self.data_dir.iterdir():
+        # 一次scandir列出目录，之后查找同名字幕只查表，不再逐个stat
+        # （normcase使Windows下的查找与文件系统一样不区分大小写）
+        with os.scandir(self.data_dir) as it:
+            entries = {os.path.normcase(entry.name): entry.path for entry in it}
+        
+        for video_path in entries.values():
+            video_file = Path(video_path)
             if video_file.suffix.lower() not in video_extensions:
                 continue
             
             # 查找同名字幕文件
             subtitle_file = None
-            sub_path = video_file.with_suffix('.ass')
-            if sub_path.exists():
-                subtitle_file = sub_path
+            sub_path = entries.get(os.path.normcase(video_file.stem + '.ass'))
+            if sub_path is not None:
+                subtitle_file = Path(sub_path)
             
             if subtitle_file:
                 # 生成音频文件路径（临时目录）
@@ -112,34 +241,25 @@ class ThresholdExperiment:
     
     def _infer_category(self, audio_path: Path) -> str:
         """从文件名或路径推断类别"""
-        name_lower = audio_path.stem.lower()
-        parent_lower = audio_path.parent.name.lower()
-        
-        if 'live' in name_lower or 'live' in parent_lower:
-            return 'live'
-        elif 'interview' in name_lower or '访谈' in name_lower or 'interview' in parent_lower:
-            return 'interview'
-        elif 'radio' in name_lower or '电台' in name_lower or 'radio' in parent_lower:
-            return 'radio'
-        elif 'anime' in name_lower or '动画' in name_lower or 'anime' in parent_lower:
-            return 'anime'
-        else:
-            return 'other'
+        return infer_category(audio_path)
     
     def run_experiment(self, threshold_range: list = None, 
                       min_speech_duration_ms: int = 250,
                       min_silence_duration_ms: int = 1000,
                       iou_threshold: float = 0.5,
-                      ffmpeg_path: str = None) -> dict:
+                      ffmpeg_path: str = None,
+                      jobs: int = None) -> dict:
         """
         运行实验
         
         Args:
-            threshold_range: 要测试的threshold值列表
+            threshold_range: 要测试的threshold值列表；都是0.01的整数倍时使用量化缓存的语音概率，
+                             否则本次运行使用原始float32概率（需要重新推理）
             min_speech_duration_ms: 最小语音持续时间
             min_silence_duration_ms: 最小静音持续时间
             iou_threshold: 匹配的IoU阈值
             ffmpeg_path: FFmpeg可执行文件路径，如果为None则使用初始化时的路径
+            jobs: 并行任务数（FFmpeg进程数和评估进程数），如果为None则使用CPU核心数
             
         Returns:
             dict: 实验结果
@@ -148,8 +268,13 @@ class ThresholdExperiment:
         if ffmpeg_path is None:
             ffmpeg_path = self.ffmpeg_path
         if threshold_range is None:
-            # 修改为0.2-0.6，步长0.05
-            threshold_range = np.arange(0.2, 0.65, 0.05).tolist()
+            # 修改为0.2-0.6，步长0.05（用整数步进，避免浮点累加误差）
+            threshold_range = [round(x / 100, 2) for x in range(20, 65, 5)]
+        
+        # 量化后的概率只在量化刻度上与原始概率等价；有阈值不在刻度上时，
+        # 本次运行改用原始float32概率（磁盘缓存中只有量化概率，需要重新推理）
+        use_quantized = all(threshold_on_prob_grid(t) for t in threshold_range)
+        probs_cache = self._probs_cache if use_quantized else self._float_probs_cache
         
         print("=" * 60)
         print("实验1: threshold参数优化")
@@ -172,13 +297,25 @@ class ThresholdExperiment:
         temp_audio_dir.mkdir(parents=True, exist_ok=True)
         
         # 提取音频文件
+        # 每个FFmpeg进程处理一组视频，以减少进程启动开销；
+        # 用asyncio子进程并发运行多个FFmpeg，信号量限制同时运行的进程数
         print("\n提取音频文件...")
-        for item in tqdm(dataset, desc="提取音频"):
-            if not Path(item['audio']).exists():
-                video_path = item['video']
-                audio_path = item['audio']
-                if not extract_audio_from_video(video_path, audio_path, ffmpeg_path):
-                    print(f"\n警告: 无法从 {video_path} 提取音频")
+        pending = [item for item in dataset if not Path(item['audio']).exists()]
+        if pending:
+            max_workers = min(jobs or os.cpu_count() or 1, len(pending))
+            batch_size = min(EXTRACT_BATCH_SIZE, -(-len(pending) // max_workers))
+            tasks = []
+            for i in range(0, len(pending), batch_size):
+                batch = pending[i:i + batch_size]
+                tasks.append(([item['video'] for item in batch],
+                              [item['audio'] for item in batch]))
+            
+            with tqdm(total=len(pending), desc="提取音频") as pbar:
+                all_results = asyncio.run(_extract_all(tasks, ffmpeg_path, max_workers, pbar))
+            for batch_results in all_results:
+                for video_path, success in batch_results:
+                    if not success:
+                        print(f"\n警告: 无法从 {video_path} 提取音频")
         
         # 统计数据
         categories = {}
@@ -191,6 +328,38 @@ class ThresholdExperiment:
             print(f"  - {cat}: {count} 个样本")
         print()
         
+        # 每个音频只运行一次VAD模型，缓存语音概率
+        # 按时长排序后分批推理，同一批次的音频长度相近，补齐的静音更少
+        audio_paths = sorted(
+            {item['audio'] for item in dataset
+             if item['audio'] not in probs_cache and Path(item['audio']).exists()},
+            key=lambda path: Path(path).stat().st_size
+        )
+        # 先从磁盘缓存加载之前运行时计算过的结果
+        if use_quantized:
+            audio_paths = [path for path in audio_paths if not self._load_cached_probs(path)]
+        with tqdm(total=len(audio_paths), desc="计算语音概率") as pbar:
+            for i in range(0, len(audio_paths), VAD_BATCH_SIZE):
+                batch = audio_paths[i:i + VAD_BATCH_SIZE]
+                try:
+                    batch_probs = self.vad_analyzer.get_speech_probs_batch(batch)
+                    for audio_path, (speech_probs, audio_length_samples) in zip(batch, batch_probs):
+                        self._store_probs(audio_path, speech_probs, audio_length_samples,
+                                          keep_float=not use_quantized)
+                except Exception:
+                    # 批量失败时逐个处理，找出出错的文件
+                    for audio_path in batch:
+                        try:
+                            speech_probs, audio_length_samples = self.vad_analyzer.get_speech_probs(audio_path)
+                            self._store_probs(audio_path, speech_probs, audio_length_samples,
+                                              keep_float=not use_quantized)
+                        except Exception as e:
+                            print(f"\n处理 {audio_path} 时出错: {e}")
+                for audio_path in batch:
+                    if audio_path in self._probs_cache:
+                        self._save_cached_probs(audio_path)
+                pbar.update(len(batch))
+        
         # 存储结果
         results = {
             'threshold_values': threshold_range,
@@ -199,69 +368,86 @@ class ThresholdExperiment:
             'overall': {}
         }
         
-        # 对每个threshold值进行测试
-        for threshold in tqdm(threshold_range, desc="测试threshold"):
-            threshold_results = {
-                'f1_scores': [],
-                'precision_scores': [],
-                'recall_scores': [],
-                'category_results': {}
-            }
-            
-            # 创建使用当前threshold的VAD分析器
-            current_vad = VADAnalyzer(
-                threshold=threshold,
-                min_speech_duration_ms=min_speech_duration_ms,
-                min_silence_duration_ms=min_silence_duration_ms
-            )
+        # 每个样本作为一个任务，在子进程中评估所有threshold
+        vad = self.vad_analyzer.vad_processor
+        vad_params = {
+            'sampling_rate': self.vad_analyzer.sampling_rate,
+            'min_speech_duration_ms': min_speech_duration_ms,
+            'max_speech_duration_s': vad.max_speech_duration_s,
+            'min_silence_duration_ms': min_silence_duration_ms,
+            'speech_pad_ms': vad.speech_pad_ms,
+            'return_seconds': True
+        }
+        tasks = []
+        for item in dataset:
+            if item['audio'] not in probs_cache:
+                print(f"\n警告: 音频文件不存在或VAD失败: {item['audio']}")
+                continue
             
-            # 对每个样本进行评估
-            for item in tqdm(dataset, desc=f"threshold={threshold:.2f}", leave=False):
+            # 加载真实字幕（每个字幕文件只解析一次）
+            if item['subtitle'] not in self._gt_cache:
                 try:
-                    # 检查音频文件是否存在
-                    if not Path(item['audio']).exists():
-                        print(f"\n警告: 音频文件不存在: {item['audio']}")
+                    self._gt_cache[item['subtitle']] = self.parser.parse_file(item['subtitle'])
+                except Exception as e:
+                    print(f"\n处理 {item['subtitle']} 时出错: {e}")
+                    continue
+            
+            speech_probs, audio_length_samples = probs_cache[item['audio']]
+            tasks.append((item, self._gt_cache[item['subtitle']], speech_probs,
+                          audio_length_samples, threshold_range, vad_params,
+                          self.config, iou_threshold))
+        
+        # 所有样本、所有threshold的 (F1, Precision, Recall) 写入同一个预分配数组，
+        # 最后按列一次性求均值和标准差
+        scores = np.empty((len(tasks), len(threshold_range), 3))
+        category_rows = {}
+        num_scored = 0
+        
+        if tasks:
+            max_workers = min(jobs or os.cpu_count() or 1, len(tasks))
+            f1_sum = np.zeros(len(threshold_range))
+            # 单个样本的评估很快，进度条限制刷新频率，避免频繁输出拖慢循环
+            with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                    tqdm(total=len(tasks), desc="评估样本", mininterval=1.0) as pbar:
+                for item, file_metrics, error in executor.map(_evaluate_file, tasks):
+                    pbar.update(1)
+                    if error is not None:
+                        print(f"\n处理 {item['audio']} 时出错: {error}")
                         continue
                     
-                    # 加载真实字幕
-                    gt_timestamps = self.parser.parse_file(item['subtitle'])
-                    
-                    # 使用当前threshold生成VAD结果
-                    vad_timestamps = current_vad.detect_speech(item['audio'])
-                    
-                    # 预处理时间戳（与src/main.py保持一致）
-                    # 调整间隔过小的语音片段
-                    pred_timestamps = pre_process(vad_timestamps, config=self.config)
-                    
-                    # 评估性能
-                    metrics = evaluate_vad_performance(pred_timestamps, gt_timestamps, iou_threshold)
-                    
                     # 记录结果
-                    threshold_results['f1_scores'].append(metrics['f1'])
-                    threshold_results['precision_scores'].append(metrics['precision'])
-                    threshold_results['recall_scores'].append(metrics['recall'])
+                    scores[num_scored] = [(metrics['f1'], metrics['precision'], metrics['recall'])
+                                          for metrics in file_metrics]
                     
                     # 按类别记录
-                    category = item['category']
-                    if category not in threshold_results['category_results']:
-                        threshold_results['category_results'][category] = []
-                    threshold_results['category_results'][category].append(metrics['f1'])
-                
-                except Exception as e:
-                    print(f"\n处理 {item['audio']} 时出错: {e}")
-                    continue
-            
+                    category_rows.setdefault(item['category'], []).append(num_scored)
+                    num_scored += 1
+                    
+                    # 在进度条上显示目前最优threshold的平均F1（随下次刷新一起输出）
+                    f1_sum += scores[num_scored - 1, :, 0]
+                    pbar.set_postfix(best_f1=f"{f1_sum.max() / num_scored:.3f}", refresh=False)
+        
+        scores = scores[:num_scored]
+        if num_scored:
+            avg_scores = scores.mean(axis=0)
+            std_f1 = scores[:, :, 0].std(axis=0)
+            category_f1 = {cat: scores[rows, :, 0].mean(axis=0)
+                           for cat, rows in category_rows.items()}
+        
+        # 汇总每个threshold的结果
+        for i, threshold in enumerate(threshold_range):
             # 计算平均值
-            avg_f1 = np.mean(threshold_results['f1_scores']) if threshold_results['f1_scores'] else 0
-            avg_precision = np.mean(threshold_results['precision_scores']) if threshold_results['precision_scores'] else 0
-            avg_recall = np.mean(threshold_results['recall_scores']) if threshold_results['recall_scores'] else 0
+            if num_scored:
+                avg_f1, avg_precision, avg_recall = avg_scores[i]
+            else:
+                avg_f1 = avg_precision = avg_recall = 0
             
             results['per_threshold'][threshold] = {
                 'avg_f1': avg_f1,
                 'avg_precision': avg_precision,
                 'avg_recall': avg_recall,
-                'std_f1': np.std(threshold_results['f1_scores']) if threshold_results['f1_scores'] else 0,
-                'category_f1': {cat: np.mean(scores) for cat, scores in threshold_results['category_results'].items()}
+                'std_f1': std_f1[i] if num_scored else 0,
+                'category_f1': {cat: f1[i] for cat, f1 in category_f1.items()} if num_scored else {}
             }
             
             print(f"threshold={threshold:.2f}: F1={avg_f1:.3f}, P={avg_precision:.3f}, R={avg_recall:.3f}")
@@ -283,41 +469,92 @@ class ThresholdExperiment:
         
         return results
     
+    def _store_probs(self, audio_path: str, speech_probs: np.ndarray, audio_length_samples: int,
+                     keep_float: bool = False):
+        """
+        保存推理得到的语音概率：量化后存入内存缓存（随后写入磁盘缓存）
+        
+        Args:
+            audio_path: 音频文件路径
+            speech_probs: 语音概率数组
+            audio_length_samples: 音频样本数
+            keep_float: 是否同时保留原始float32概率（供不在量化刻度上的阈值使用）
+        """
+        self._probs_cache[audio_path] = (quantize_speech_probs(speech_probs), audio_length_samples)
+        if keep_float:
+            self._float_probs_cache[audio_path] = (speech_probs, audio_length_samples)
+    
+    def _load_cached_probs(self, audio_path: str) -> bool:
+        """
+        从VAD结果缓存加载语音概率到内存缓存
+        
+        Args:
+            audio_path: 音频文件路径
+            
+        Returns:
+            bool: 是否命中缓存
+        """
+        try:
+            cached = self.vad_cache.get_probs(self.vad_analyzer.probs_cache_key(audio_path))
+        except Exception as e:
+            print(f"\n警告: 读取语音概率缓存失败 {audio_path}: {e}")
+            return False
+        if cached is None:
+            return False
+        self._probs_cache[audio_path] = cached
+        return True
+    
+    def _save_cached_probs(self, audio_path: str):
+        """
+        将内存中的语音概率写入VAD结果缓存
+        
+        Args:
+            audio_path: 音频文件路径
+        """
+        speech_probs, audio_length_samples = self._probs_cache[audio_path]
+        try:
+            self.vad_cache.put_probs(self.vad_analyzer.probs_cache_key(audio_path),
+                                     speech_probs, audio_length_samples)
+        except Exception as e:
+            print(f"\n警告: 写入语音概率缓存失败 {audio_path}: {e}")
+    
     def _save_results(self, results: dict):
         """保存结果到JSON文件"""
         output_file = self.results_dir / 'exp1_threshold_results.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        save_results_json(results, output_file)
         print(f"\n结果已保存到: {output_file}")
     
     def _plot_results(self, results: dict):
         """绘制结果图表"""
+        # 仅在绘图时导入pyplot，减少启动开销
+        import matplotlib.pyplot as plt
+        
         thresholds = results['threshold_values']
         f1_scores = [results['per_threshold'][t]['avg_f1'] for t in thresholds]
         precision_scores = [results['per_threshold'][t]['avg_precision'] for t in thresholds]
         recall_scores = [results['per_threshold'][t]['avg_recall'] for t in thresholds]
         
-        plt.figure(figsize=(12, 6))
+        fig, ax = plt.subplots(figsize=(12, 6))
         
-        plt.plot(thresholds, f1_scores, 'o-', label='F1 Score', linewidth=2)
-        plt.plot(thresholds, precision_scores, 's-', label='Precision', linewidth=2)
-        plt.plot(thresholds, recall_scores, '^-', label='Recall', linewidth=2)
+        ax.plot(thresholds, f1_scores, 'o-', label='F1 Score', linewidth=2)
+        ax.plot(thresholds, precision_scores, 's-', label='Precision', linewidth=2)
+        ax.plot(thresholds, recall_scores, '^-', label='Recall', linewidth=2)
         
         # 标记最优点
         best_threshold = results['overall']['best_threshold']
         best_f1 = results['overall']['best_f1']
-        plt.plot(best_threshold, best_f1, 'r*', markersize=15, label=f'Best (threshold={best_threshold:.2f})')
+        ax.plot(best_threshold, best_f1, 'r*', markersize=15, label=f'Best (threshold={best_threshold:.2f})')
         
-        plt.xlabel('Threshold', fontsize=12)
-        plt.ylabel('Score', fontsize=12)
-        plt.title('VAD Performance vs Threshold', fontsize=14)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
+        ax.set_xlabel('Threshold', fontsize=12)
+        ax.set_ylabel('Score', fontsize=12)
+        ax.set_title('VAD Performance vs Threshold', fontsize=14)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
         
         output_file = self.results_dir / 'exp1_threshold_plot.png'
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
         print(f"图表已保存到: {output_file}")
-        plt.close()
+        plt.close(fig)
 
 
 if __name__ == '__main__':
@@ -328,9 +565,11 @@ if __name__ == '__main__':
                        help='数据目录路径')
     parser.add_argument('--results_dir', type=str, default='exp/results',
                        help='结果输出目录')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='并行任务数，用于音频提取和评估 (默认: CPU核心数)')
     
     args = parser.parse_args()
     
     experiment = ThresholdExperiment(args.data_dir, args.results_dir)
-    experiment.run_experiment()
+    experiment.run_experiment(jobs=args.jobs)
 
@@ -4,14 +4,22 @@
 """
 import sys
 from pathlib import Path
-import json
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 from collections import defaultdict
 
+# 实验只保存图片，使用非交互后端，避免探测GUI后端
+matplotlib.use('Agg')
+
 sys.path.insert(0, str(Path(__file__).parent))
 
 from subtitle_parser import SubtitleParser
+from category import infer_category
+from result_io import save_results_json
+
+# 并行解析字幕文件的最大线程数
+PARSE_WORKERS = 16
 
 
 class MinSilenceExperiment:
@@ -56,41 +64,39 @@ class MinSilenceExperiment:
         
         print(f"找到 {len(subtitle_files)} 个字幕文件")
         
-        # 收集所有间隔
-        all_gaps = []
-        category_gaps = defaultdict(list)
-        
-        for subtitle_file in subtitle_files:
-            try:
-                # 解析字幕
-                timestamps = self.parser.parse_file(str(subtitle_file))
-                
-                # 提取间隔
-                gaps = self.parser.extract_gaps(timestamps)
-                
-                # 过滤掉0值
-                gaps = [g for g in gaps if g > 0]
-                
-                all_gaps.extend(gaps)
-                
-                # 按类别分组
-                category = self._infer_category(subtitle_file)
-                category_gaps[category].extend(gaps)
-                
-                print(f"  {subtitle_file.name}: {len(gaps)} 个间隔")
-            
-            except Exception as e:
-                print(f"  错误: 处理 {subtitle_file.name} 失败: {e}")
+        # 收集所有间隔（每个文件一个数组，最后统一拼接）
+        all_gaps_list = []
+        category_gaps_list = defaultdict(list)
+        
+        # 字幕解析以文件读取为主，用线程池并行处理；map保持文件顺序，输出与串行一致
+        with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, len(subtitle_files))) as executor:
+            parsed = list(executor.map(self._parse_one, subtitle_files))
+        
+        for subtitle_file, gaps, error in parsed:
+            if error is not None:
+                print(f"  错误: 处理 {subtitle_file.name} 失败: {error}")
                 continue
+            
+            all_gaps_list.append(gaps)
+            
+            # 按类别分组
+            category = self._infer_category(subtitle_file)
+            category_gaps_list[category].append(gaps)
+            
+            print(f"  {subtitle_file.name}: {len(gaps)} 个间隔")
         
-        if not all_gaps:
+        all_gaps = np.concatenate(all_gaps_list) if all_gaps_list else np.empty(0)
+        category_gaps = {category: np.concatenate(gaps_list)
+                         for category, gaps_list in category_gaps_list.items()}
+        
+        if len(all_gaps) == 0:
             print("错误: 未收集到任何间隔数据")
             return {}
         
         print(f"\n总共收集到 {len(all_gaps)} 个间隔")
         
         # 去重
-        unique_gaps = list(set(all_gaps))
+        unique_gaps = np.unique(all_gaps)
         print(f"去重后: {len(unique_gaps)} 个唯一间隔")
         
         # 计算统计信息
@@ -103,7 +109,7 @@ class MinSilenceExperiment:
         
         # 按类别统计
         for category, gaps in category_gaps.items():
-            if gaps:
+            if len(gaps) > 0:
                 results['by_category'][category] = self._calculate_statistics(gaps, percentile)
         
         # 输出结果
@@ -128,34 +134,45 @@ class MinSilenceExperiment:
         
         return results
     
+    def _parse_one(self, subtitle_file: Path) -> tuple:
+        """
+        解析单个字幕文件并提取间隔（在线程池中运行）
+        
+        Args:
+            subtitle_file: 字幕文件路径
+            
+        Returns:
+            tuple: (字幕文件路径, 间隔数组, 错误信息)，成功时错误信息为None
+        """
+        try:
+            # 解析字幕
+            timestamps = self.parser.parse_file(str(subtitle_file))
+            
+            # 提取间隔（已过滤掉0值和负值）
+            gaps = self.parser.extract_gaps(timestamps)
+            
+            return subtitle_file, gaps, None
+        
+        except Exception as e:
+            return subtitle_file, None, e
+    
     def _infer_category(self, subtitle_path: Path) -> str:
         """推断类别"""
-        name_lower = subtitle_path.stem.lower()
-        parent_lower = subtitle_path.parent.name.lower()
-        
-        if 'live' in name_lower or 'live' in parent_lower:
-            return 'live'
-        elif 'interview' in name_lower or '访谈' in name_lower or 'interview' in parent_lower:
-            return 'interview'
-        elif 'radio' in name_lower or '电台' in name_lower or 'radio' in parent_lower:
-            return 'radio'
-        elif 'anime' in name_lower or '动画' in name_lower or 'anime' in parent_lower:
-            return 'anime'
-        else:
-            return 'other'
+        return infer_category(subtitle_path)
     
-    def _calculate_statistics(self, gaps: list, percentile: float) -> dict:
-        """计算统计信息"""
-        gaps_array = np.array(gaps)
+    def _calculate_statistics(self, gaps: np.ndarray, percentile: float) -> dict:
+        """计算统计信息（排序一次，最值按下标读取，中位数和分位数由一次np.percentile得到）"""
+        sorted_gaps = np.sort(np.asarray(gaps, dtype=np.float64))
+        median, percentile_value = np.percentile(sorted_gaps, [50, percentile])
         
         return {
-            'count': len(gaps),
-            'min': float(np.min(gaps_array)),
-            'max': float(np.max(gaps_array)),
-            'mean': float(np.mean(gaps_array)),
-            'median': float(np.median(gaps_array)),
-            'std': float(np.std(gaps_array)),
-            'percentile_value': float(np.percentile(gaps_array, percentile)),
+            'count': len(sorted_gaps),
+            'min': float(sorted_gaps[0]),
+            'max': float(sorted_gaps[-1]),
+            'mean': float(sorted_gaps.mean()),
+            'median': float(median),
+            'std': float(sorted_gaps.std()),
+            'percentile_value': float(percentile_value),
             'percentile': percentile
         }
     
@@ -173,18 +190,23 @@ class MinSilenceExperiment:
     def _save_results(self, results: dict):
         """保存结果"""
         output_file = self.results_dir / 'exp2_min_silence_results.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        save_results_json(results, output_file)
         print(f"\n结果已保存到: {output_file}")
     
-    def _plot_results(self, all_gaps: list, category_gaps: dict, percentile: float):
+    def _plot_results(self, all_gaps: np.ndarray, category_gaps: dict, percentile: float):
         """绘制结果图表"""
+        # 仅在绘图时导入pyplot，减少启动开销
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 1, figsize=(12, 10))
         
         # 图1: 整体间隔分布
         ax1 = axes[0]
-        gaps_ms = [g * 1000 for g in all_gaps]  # 转换为毫秒
-        ax1.hist(gaps_ms, bins=100, alpha=0.7, edgecolor='black')
+        gaps_ms = np.asarray(all_gaps, dtype=np.float64) * 1000.0  # 转换为毫秒
+        # 先用NumPy分箱，再按箱绘制柱状图
+        counts, edges = np.histogram(gaps_ms, bins=100)
+        ax1.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                alpha=0.7, edgecolor='black')
         
         # 标记百分位数
         percentile_value = np.percentile(gaps_ms, percentile)
@@ -203,8 +225,8 @@ class MinSilenceExperiment:
         category_labels = []
         
         for category, gaps in sorted(category_gaps.items()):
-            if gaps:
-                category_data.append([g * 1000 for g in gaps])
+            if len(gaps) > 0:
+                category_data.append(np.asarray(gaps, dtype=np.float64) * 1000.0)
                 category_labels.append(f"{category}\n(n={len(gaps)})")
         
         if category_data:
@@ -219,12 +241,12 @@ class MinSilenceExperiment:
             ax2.set_title('Gap Distribution by Category', fontsize=14)
             ax2.grid(True, alpha=0.3, axis='y')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_file = self.results_dir / 'exp2_min_silence_plot.png'
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
         print(f"图表已保存到: {output_file}")
-        plt.close()
+        plt.close(fig)
 
 
 if __name__ == '__main__':
@@ -10,25 +10,116 @@
 
 注意：此实验不使用pre_process，因为我们需要分析VAD的原始间隔来决定merge_min_gap参数
 """
+import math
+import os
 import sys
 from pathlib import Path
-import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
-from collections import defaultdict
+import matplotlib
 from tqdm import tqdm
 
+# 实验只保存图片，使用非交互后端，避免探测GUI后端
+matplotlib.use('Agg')
+
 sys.path.insert(0, str(Path(__file__).parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from subtitle_parser import SubtitleParser
-from vad_analyzer import VADAnalyzer, SILERO_AVAILABLE, extract_audio_from_video
+from category import infer_category
+from result_io import save_results_json
+from vad_analyzer import VADAnalyzer, VADResultCache, SILERO_AVAILABLE, extract_audio_from_video, timestamps_to_segments
+
+
+# 并发FFmpeg提取进程数，以及每个FFmpeg进程的解码线程数
+EXTRACT_WORKERS = 8
+EXTRACT_THREADS = 2
+
+# int8量化的Silero VAD模型，存在时优先使用（需与已安装的silero-vad版本的模型输入输出一致）
+INT8_MODEL_PATH = Path(__file__).parent.parent / 'models' / 'silero_vad.int8.onnx'
+
+# 子进程中的VAD分析器，每个进程只加载一次模型
+_worker_analyzer = None
+
+
+def _init_worker(onnx_model_path: str = None):
+    """进程池初始化：在子进程中加载VAD模型（与主进程使用同一个模型文件）"""
+    global _worker_analyzer
+    _worker_analyzer = VADAnalyzer(use_onnx=True, onnx_model_path=onnx_model_path)
+
+
+def _find_merge_points(item: dict) -> tuple:
+    """
+    解析真实字幕，找到首尾相连的时间戳
+    
+    Args:
+        item: 数据样本
+        
+    Returns:
+        tuple: (连接点数组, 错误信息)，成功时错误信息为None
+    """
+    try:
+        gt_timestamps = SubtitleParser.parse_file(item['subtitle'])
+        return SubtitleParser.find_merged_timestamps(gt_timestamps, tolerance=0.05), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _process_batch(task: tuple) -> list:
+    """
+    处理一批样本：批量运行VAD并查找连接点附近的间隔（供进程池调用）
+    
+    同一批次中的音频作为批次的不同行一起推理；批量推理失败时逐个重试，
+    使错误只影响出错的样本
+    
+    Args:
+        task: (样本列表, 各样本的连接点数组, VAD参数, 搜索窗口大小, VAD结果缓存)
+        
+    Returns:
+        list: 每个样本的 (样本, 间隔数组, 错误信息)，成功时错误信息为None，与输入顺序一致
+    """
+    items, batch_merge_points, vad_params, search_window, vad_cache = task
+    no_gaps = np.empty(0, dtype=np.float64)
+    results = []
+    
+    # 生成VAD时间戳
+    # 注意：这里直接使用VAD的原始输出，不调用pre_process进行合并；
+    # 结果缓存在VAD结果缓存中，重复运行或实验1已计算过语音概率时不再运行模型
+    audio_paths = [item['audio'] for item in items]
+    try:
+        batch_timestamps = _worker_analyzer.detect_speech_batch_cached(audio_paths, vad_cache, as_array=True,
+                                                                       **vad_params)
+    except Exception:
+        batch_timestamps = None
+    
+    for k, (item, merge_points) in enumerate(zip(items, batch_merge_points)):
+        try:
+            if batch_timestamps is not None:
+                vad_timestamps = batch_timestamps[k]
+            else:
+                vad_timestamps = _worker_analyzer.detect_speech_cached(item['audio'], vad_cache, as_array=True,
+                                                                       **vad_params)
+            # 重要：此处不调用pre_process，以获取VAD的原始间隔用于分析
+            
+            # 对所有merge_point，一次性在VAD结果中查找对应的end和start
+            gaps = MergeMinGapExperiment._find_gaps_near_timestamps(
+                vad_timestamps,
+                merge_points,
+                search_window
+            )
+            results.append((item, gaps, None))
+        except Exception as e:
+            results.append((item, no_gaps, str(e)))
+    
+    return results
 
 
 class MergeMinGapExperiment:
     """merge_min_gap参数分析实验"""
     
-    def __init__(self, data_dir: str, results_dir: str, ffmpeg_path: str = None):
+    def __init__(self, data_dir: str, results_dir: str, ffmpeg_path: str = None,
+                 vad_batch_size: int = 8, onnx_model_path: str = None,
+                 vad_cache: VADResultCache = None):
         """
         初始化实验
         
@@ -36,15 +127,25 @@ class MergeMinGapExperiment:
             data_dir: 数据目录
             results_dir: 结果输出目录
             ffmpeg_path: FFmpeg可执行文件路径，如果为None则尝试从配置文件读取
+            vad_batch_size: 每个子进程一次批量推理的最大音频文件数；
+                            多个子进程并行时不宜过大，避免占用过多内存
+            onnx_model_path: 自定义ONNX模型路径，为None时若存在models/silero_vad.int8.onnx
+                             则使用该量化模型，否则使用silero-vad自带模型
+            vad_cache: 与其他实验共用的VAD结果缓存，为None时使用results_dir/vad_cache
         """
         self.data_dir = Path(data_dir)
         self.results_dir = Path(results_dir)
+        self.vad_batch_size = max(1, vad_batch_size)
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
         if not SILERO_AVAILABLE:
             raise ImportError("需要安装Silero VAD")
         
-        self.vad_analyzer = VADAnalyzer(use_onnx=True)
+        if onnx_model_path is None and INT8_MODEL_PATH.exists():
+            onnx_model_path = str(INT8_MODEL_PATH)
+        self.onnx_model_path = onnx_model_path
+        self.vad_analyzer = VADAnalyzer(use_onnx=True, onnx_model_path=onnx_model_path)
+        self.vad_cache = vad_cache if vad_cache is not None else VADResultCache(self.results_dir / 'vad_cache')
         self.parser = SubtitleParser()
         
         # 尝试从主配置文件读取ffmpeg_path
@@ -64,7 +165,8 @@ class MergeMinGapExperiment:
                       min_silence_duration_ms: int = 1000,
                       search_window: float = 0.5,
                       percentile: float = 5.0,
-                      ffmpeg_path: str = None) -> dict:
+                      ffmpeg_path: str = None,
+                      jobs: int = None) -> dict:
         """
         运行实验
         
@@ -76,6 +178,7 @@ class MergeMinGapExperiment:
             search_window: 搜索窗口大小（秒）
             percentile: 要计算的百分位数
             ffmpeg_path: FFmpeg可执行文件路径，如果为None则使用初始化时的路径
+            jobs: 并行处理的进程数，默认为CPU核心数
             
         Returns:
             dict: 实验结果
@@ -108,63 +211,86 @@ class MergeMinGapExperiment:
         temp_audio_dir = self.results_dir / 'temp_audio'
         temp_audio_dir.mkdir(parents=True, exist_ok=True)
         
-        # 提取音频文件
+        # 提取音频文件，同时解析字幕
+        # 提取的主要耗时在FFmpeg子进程中，用线程池并发启动多个FFmpeg；
+        # 线程只是等待子进程结束，字幕解析在主线程进行，与提取重叠
         print("\n提取音频文件...")
-        for item in tqdm(dataset, desc="提取音频"):
-            if not Path(item['audio']).exists():
-                video_path = item['video']
-                audio_path = item['audio']
-                if not extract_audio_from_video(video_path, audio_path, ffmpeg_path):
-                    print(f"\n警告: 无法从 {video_path} 提取音频")
-        
-        # 收集间隔数据
-        all_gaps = []
-        category_gaps = defaultdict(list)
-        
-        for item in tqdm(dataset, desc="处理数据"):
-            try:
-                # 1. 解析真实字幕，找到首尾相连的时间戳
-                gt_timestamps = self.parser.parse_file(item['subtitle'])
-                merge_points = self.parser.find_merged_timestamps(gt_timestamps, tolerance=0.05)
-                
-                if not merge_points:
-                    continue
-                
-                # 检查音频文件是否存在
-                if not Path(item['audio']).exists():
-                    continue
-                
-                # 2. 生成VAD时间戳
-                # 注意：这里直接使用VAD的原始输出，不调用pre_process进行合并
-                vad_analyzer = VADAnalyzer(
-                    threshold=threshold,
-                    min_speech_duration_ms=min_speech_duration_ms,
-                    max_speech_duration_s=max_speech_duration_s,
-                    min_silence_duration_ms=min_silence_duration_ms
-                )
-                vad_timestamps = vad_analyzer.detect_speech(item['audio'])
-                # 重要：此处不调用pre_process，以获取VAD的原始间隔用于分析
-                
-                # 3. 对每个merge_point，在VAD结果中查找对应的end和start
-                for merge_ts in merge_points:
-                    gap = self._find_gap_near_timestamp(
-                        vad_timestamps, 
-                        merge_ts, 
-                        search_window
-                    )
-                    
-                    if gap is not None:
-                        all_gaps.append(gap)
-                        
-                        # 按类别分组
-                        category = item['category']
-                        category_gaps[category].append(gap)
+        missing = [item for item in dataset if not Path(item['audio']).exists()]
+        if missing:
+            def extract(item):
+                return extract_audio_from_video(item['video'], item['audio'], ffmpeg_path,
+                                                threads=EXTRACT_THREADS)
             
-            except Exception as e:
-                print(f"\n处理 {item['audio']} 时出错: {e}")
-                continue
+            max_workers = min(EXTRACT_WORKERS, os.cpu_count() or 1, len(missing))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                extracted = executor.map(extract, missing)
+                parsed = [_find_merge_points(item) for item in dataset]
+                for item, ok in zip(missing, tqdm(extracted, total=len(missing), desc="提取音频")):
+                    if not ok:
+                        print(f"\n警告: 无法从 {item['video']} 提取音频")
+        else:
+            parsed = [_find_merge_points(item) for item in dataset]
+        
+        # 解析失败、没有连接点或音频文件不存在的样本不需要运行VAD
+        no_gaps = np.empty(0, dtype=np.float64)
+        results = [(item, no_gaps, error) for item, (_, error) in zip(dataset, parsed)]
+        pending = [i for i, (item, (merge_points, error)) in enumerate(zip(dataset, parsed))
+                   if error is None and len(merge_points) > 0 and Path(item['audio']).exists()]
+        
+        # 各文件相互独立，在进程池中并行处理（每个子进程加载一个VAD模型）
+        vad_params = {
+            'threshold': threshold,
+            'min_speech_duration_ms': min_speech_duration_ms,
+            'max_speech_duration_s': max_speech_duration_s,
+            'min_silence_duration_ms': min_silence_duration_ms
+        }
         
-        if not all_gaps:
+        if pending:
+            max_workers = min(jobs or os.cpu_count() or 1, len(pending))
+            
+            # 按音频大小排序后分批，同一批次的音频长度相近，补齐的静音较少；
+            # 数据较少时减小批次，保证每个子进程都有任务
+            batch_size = min(self.vad_batch_size, math.ceil(len(pending) / max_workers))
+            order = sorted(pending, key=lambda i: self._audio_size(dataset[i]['audio']))
+            batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+            tasks = [([dataset[i] for i in batch], [parsed[i][0] for i in batch],
+                      vad_params, search_window, self.vad_cache)
+                     for batch in batches]
+            
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self.onnx_model_path,)) as executor:
+                with tqdm(total=len(pending), desc="处理数据", mininterval=1.0) as pbar:
+                    for batch, batch_results in zip(batches, executor.map(_process_batch, tasks)):
+                        for i, result in zip(batch, batch_results):
+                            results[i] = result
+                        pbar.update(len(batch))
+        
+        # 按数据集顺序汇总：先统计总数，再把各文件的间隔写入预分配的数组，
+        # 同时记录每个间隔所属类别的编号（按类别首次出现的顺序编号）
+        succeeded = []
+        for item, gaps, error in results:
+            if error is not None:
+                print(f"\n处理 {item['audio']} 时出错: {error}")
+                continue
+            succeeded.append((item, gaps))
+        
+        total = sum(len(gaps) for _, gaps in succeeded)
+        all_gaps = np.empty(total, dtype=np.float64)
+        gap_categories = np.empty(total, dtype=np.int32)
+        category_ids = {}
+        offset = 0
+        for item, gaps in succeeded:
+            category_id = category_ids.setdefault(item['category'], len(category_ids))
+            all_gaps[offset:offset + len(gaps)] = gaps
+            gap_categories[offset:offset + len(gaps)] = category_id
+            offset += len(gaps)
+        
+        # 按类别拆分：稳定排序保持每个类别内的原始顺序
+        order = np.argsort(gap_categories, kind='stable')
+        counts = np.bincount(gap_categories, minlength=len(category_ids))
+        category_gaps = dict(zip(category_ids, np.split(all_gaps[order], np.cumsum(counts)[:-1])))
+        
+        if total == 0:
             print("错误: 未收集到任何间隔数据")
             return {}
         
@@ -179,7 +305,7 @@ class MergeMinGapExperiment:
         
         # 按类别统计
         for category, gaps in category_gaps.items():
-            if gaps:
+            if len(gaps) > 0:
                 results['by_category'][category] = self._calculate_statistics(gaps, percentile)
         
         # 输出结果
@@ -211,16 +337,22 @@ class MergeMinGapExperiment:
         
         video_extensions = ['.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv']
         
-        for video_file in self.data_dir.iterdir():
+        # 一次scandir列出目录，之后查找同名字幕只查表，不再逐个stat
+        # （normcase使Windows下的查找与文件系统一样不区分大小写）
+        with os.scandir(self.data_dir) as it:
+            entries = {os.path.normcase(entry.name): entry.path for entry in it}
+        
+        for video_path in entries.values():
+            video_file = Path(video_path)
             if video_file.suffix.lower() not in video_extensions:
                 continue
             
             # 查找同名字幕文件
             subtitle_file = None
             for ext in ['.ass', '.srt']:
-                sub_path = video_file.with_suffix(ext)
-                if sub_path.exists():
-                    subtitle_file = sub_path
+                sub_path = entries.get(os.path.normcase(video_file.stem + ext))
+                if sub_path is not None:
+                    subtitle_file = Path(sub_path)
                     break
             
             if subtitle_file:
@@ -236,72 +368,80 @@ class MergeMinGapExperiment:
         
         return dataset
     
+    @staticmethod
+    def _audio_size(audio_path: str) -> int:
+        """音频文件大小（字节），文件不存在时为0"""
+        try:
+            return os.path.getsize(audio_path)
+        except OSError:
+            return 0
+    
     def _infer_category(self, audio_path: Path) -> str:
         """推断类别"""
-        name_lower = audio_path.stem.lower()
-        parent_lower = audio_path.parent.name.lower()
-        
-        if 'live' in name_lower or 'live' in parent_lower:
-            return 'live'
-        elif 'interview' in name_lower or '访谈' in name_lower or 'interview' in parent_lower:
-            return 'interview'
-        elif 'radio' in name_lower or '电台' in name_lower or 'radio' in parent_lower:
-            return 'radio'
-        elif 'anime' in name_lower or '动画' in name_lower or 'anime' in parent_lower:
-            return 'anime'
-        else:
-            return 'other'
+        return infer_category(audio_path)
     
-    def _find_gap_near_timestamp(self, vad_timestamps: list, 
-                                 target_ts: float, 
-                                 window: float) -> float:
+    @staticmethod
+    def _find_gaps_near_timestamps(vad_timestamps,
+                                   target_timestamps: list,
+                                   window: float) -> np.ndarray:
         """
-        在目标时间戳附近查找VAD的间隔
+        在每个目标时间戳附近查找VAD的间隔
+        
+        对每个目标时间戳，取 [target_ts - window, target_ts] 内最大的end
+        和 [target_ts, target_ts + window] 内最小的start，两者之差为正时即为间隔。
+        在有序的end和start上用二分查找定位，所有目标时间戳一起处理
         
         Args:
-            vad_timestamps: VAD时间戳列表
-            target_ts: 目标时间戳（真实字幕的连接点）
+            vad_timestamps: VAD时间戳列表，或(N, 2)的(start, end)数组
+            target_timestamps: 目标时间戳列表（真实字幕的连接点）
             window: 搜索窗口大小
             
         Returns:
-            float: 找到的间隔，如果未找到返回None
+            np.ndarray: 找到的间隔（按目标时间戳顺序，未找到的被跳过）
         """
-        # 在 [target_ts - window, target_ts] 区间内查找end
-        end_candidates = []
-        for ts in vad_timestamps:
-            if target_ts - window <= ts['end'] <= target_ts:
-                end_candidates.append(ts['end'])
-        
-        # 在 [target_ts, target_ts + window] 区间内查找start
-        start_candidates = []
-        for ts in vad_timestamps:
-            if target_ts <= ts['start'] <= target_ts + window:
-                start_candidates.append(ts['start'])
-        
-        # 如果两者都存在，计算间隔
-        if end_candidates and start_candidates:
-            # 选择最接近target_ts的end和start
-            best_end = max(end_candidates)  # 离target_ts最近的end
-            best_start = min(start_candidates)  # 离target_ts最近的start
-            
-            gap = best_start - best_end
-            if gap > 0:  # 确保是正间隔
-                return gap
-        
-        return None
+        targets = np.asarray(target_timestamps, dtype=np.float64)
+        if len(vad_timestamps) == 0 or len(targets) == 0:
+            return np.empty(0)
+        
+        segments = timestamps_to_segments(vad_timestamps)
+        starts = segments[:, 0]
+        ends = segments[:, 1]
+        # VAD输出的片段已按时间排列，通常无需排序
+        if not np.all(starts[1:] >= starts[:-1]):
+            starts = np.sort(starts)
+        if not np.all(ends[1:] >= ends[:-1]):
+            ends = np.sort(ends)
+        
+        # 不超过target_ts的最大end，以及不小于target_ts的最小start
+        end_idx = np.searchsorted(ends, targets, side='right') - 1
+        start_idx = np.searchsorted(starts, targets, side='left')
+        has_end = end_idx >= 0
+        has_start = start_idx < len(starts)
+        
+        best_end = ends[np.maximum(end_idx, 0)]
+        best_start = starts[np.minimum(start_idx, len(starts) - 1)]
+        
+        # 两者都必须落在搜索窗口内，且间隔为正
+        valid = (has_end & has_start
+                 & (targets - window <= best_end)
+                 & (best_start <= targets + window))
+        gaps = best_start - best_end
+        return gaps[valid & (gaps > 0)]
     
-    def _calculate_statistics(self, gaps: list, percentile: float) -> dict:
-        """计算统计信息"""
-        gaps_array = np.array(gaps)
+    def _calculate_statistics(self, gaps: np.ndarray, percentile: float) -> dict:
+        """计算统计信息（最值、中位数和分位数由一次np.percentile得到）"""
+        gaps_array = np.asarray(gaps, dtype=np.float64)
+        min_value, median, percentile_value, max_value = np.percentile(
+            gaps_array, [0, 50, percentile, 100])
         
         return {
-            'count': len(gaps),
-            'min': float(np.min(gaps_array)),
-            'max': float(np.max(gaps_array)),
-            'mean': float(np.mean(gaps_array)),
-            'median': float(np.median(gaps_array)),
-            'std': float(np.std(gaps_array)),
-            'percentile_value': float(np.percentile(gaps_array, percentile)),
+            'count': len(gaps_array),
+            'min': float(min_value),
+            'max': float(max_value),
+            'mean': float(gaps_array.mean()),
+            'median': float(median),
+            'std': float(gaps_array.std()),
+            'percentile_value': float(percentile_value),
             'percentile': percentile
         }
     
@@ -319,18 +459,23 @@ class MergeMinGapExperiment:
     def _save_results(self, results: dict):
         """保存结果"""
         output_file = self.results_dir / 'exp3_merge_min_gap_results.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        save_results_json(results, output_file)
         print(f"\n结果已保存到: {output_file}")
     
-    def _plot_results(self, all_gaps: list, category_gaps: dict, percentile: float):
+    def _plot_results(self, all_gaps: np.ndarray, category_gaps: dict, percentile: float):
         """绘制结果图表"""
+        # 仅在绘图时导入pyplot，减少启动开销
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 1, figsize=(12, 10))
         
         # 图1: 整体间隔分布
         ax1 = axes[0]
-        gaps_ms = [g * 1000 for g in all_gaps]
-        ax1.hist(gaps_ms, bins=100, alpha=0.7, edgecolor='black')
+        gaps_ms = np.asarray(all_gaps, dtype=np.float64) * 1000.0  # 转换为毫秒
+        # 先用NumPy分箱，再按箱绘制柱状图
+        counts, edges = np.histogram(gaps_ms, bins=100)
+        ax1.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                alpha=0.7, edgecolor='black')
         
         # 标记百分位数
         percentile_value = np.percentile(gaps_ms, percentile)
@@ -349,8 +494,8 @@ class MergeMinGapExperiment:
         category_labels = []
         
         for category, gaps in sorted(category_gaps.items()):
-            if gaps:
-                category_data.append([g * 1000 for g in gaps])
+            if len(gaps) > 0:
+                category_data.append(np.asarray(gaps, dtype=np.float64) * 1000.0)
                 category_labels.append(f"{category}\n(n={len(gaps)})")
         
         if category_data:
@@ -364,12 +509,12 @@ class MergeMinGapExperiment:
             ax2.set_title('Merge Gap Distribution by Category', fontsize=14)
             ax2.grid(True, alpha=0.3, axis='y')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         output_file = self.results_dir / 'exp3_merge_min_gap_plot.png'
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
         print(f"图表已保存到: {output_file}")
-        plt.close()
+        plt.close(fig)
 
 
 if __name__ == '__main__':
@@ -384,12 +529,18 @@ if __name__ == '__main__':
                        help='VAD阈值')
     parser.add_argument('--percentile', type=float, default=5.0,
                        help='百分位数 (0-100)')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='并行处理的进程数 (默认: CPU核心数)')
+    parser.add_argument('--vad_batch_size', type=int, default=8,
+                       help='每个进程批量推理的最大音频文件数')
     
     args = parser.parse_args()
     
-    experiment = MergeMinGapExperiment(args.data_dir, args.results_dir)
+    experiment = MergeMinGapExperiment(args.data_dir, args.results_dir,
+                                       vad_batch_size=args.vad_batch_size)
     experiment.run_experiment(
         threshold=args.threshold,
-        percentile=args.percentile
+        percentile=args.percentile,
+        jobs=args.jobs
     )
 
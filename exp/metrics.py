@@ -2,9 +2,17 @@
 评估指标计算
 用于计算VAD结果与真实字幕之间的匹配度
 """
-import numpy as np
+from operator import itemgetter
 from typing import List, Dict, Tuple
 
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 def calculate_iou(pred_start: float, pred_end: float, 
                   gt_start: float, gt_end: float) -> float:
@@ -36,47 +44,123 @@ def calculate_iou(pred_start: float, pred_end: float,
     return intersection / union
 
 
-def match_timestamps(pred_timestamps: List[Dict[str, float]], 
-                    gt_timestamps: List[Dict[str, float]],
-                    iou_threshold: float = 0.5) -> Tuple[int, int, int]:
+def _start_end_arrays(timestamps) -> Tuple[np.ndarray, np.ndarray]:
     """
-    匹配预测时间戳和真实时间戳
+    取出时间戳的起止时间数组
     
     Args:
-        pred_timestamps: 预测的时间戳列表
-        gt_timestamps: 真实的时间戳列表
-        iou_threshold: IoU阈值，超过此值视为匹配
+        timestamps: 时间戳字典列表，字段为start、end的记录数组，或形状为 (N, 2) 的 [start, end] 数组
         
     Returns:
-        Tuple[int, int, int]: (真正例, 假正例, 假负例)
-            TP: 预测正确的数量
-            FP: 预测错误的数量（多余的预测）
-            FN: 漏检的数量（未预测到的真实标注）
+        Tuple[np.ndarray, np.ndarray]: (起始时间数组, 结束时间数组)，均为float64
+    """
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.names is None:
+        segments = timestamps.reshape(-1, 2)
+        return (np.ascontiguousarray(segments[:, 0], dtype=np.float64),
+                np.ascontiguousarray(segments[:, 1], dtype=np.float64))
+    if isinstance(timestamps, np.ndarray):
+        return (np.ascontiguousarray(timestamps['start'], dtype=np.float64),
+                np.ascontiguousarray(timestamps['end'], dtype=np.float64))
+    starts = np.fromiter(map(itemgetter('start'), timestamps), dtype=np.float64, count=len(timestamps))
+    ends = np.fromiter(map(itemgetter('end'), timestamps), dtype=np.float64, count=len(timestamps))
+    return starts, ends
+
+
+def _match_kernel(pred_starts, pred_ends, gt_starts, gt_ends,
+                  candidate_lo, candidate_hi, iou_threshold) -> int:
+    """
+    贪心匹配的核心循环，返回成功匹配的数量（真正例）
+    
+    IoU计算与calculate_iou相同，在循环内展开；安装numba时会被JIT编译。
+    每个预测只扫描与其可能重叠的真实时间戳 [candidate_lo[i], candidate_hi[i])，
+    区间外的IoU必为0，不会被选中，因此结果与扫描全部真实时间戳相同
+    
+    Args:
+        pred_starts: 预测起始时间序列
+        pred_ends: 预测结束时间序列
+        gt_starts: 真实起始时间序列（按起始时间排序）
+        gt_ends: 真实结束时间序列
+        candidate_lo: 每个预测的候选区间起点
+        candidate_hi: 每个预测的候选区间终点（不含）
+        iou_threshold: IoU阈值
+        
+    Returns:
+        int: 真正例数量
     """
-    gt_matched = [False] * len(gt_timestamps)
-    pred_matched = [False] * len(pred_timestamps)
+    gt_matched = np.zeros(len(gt_starts), dtype=np.bool_)
+    tp = 0
     
     # 对每个预测时间戳，找到最佳匹配的真实时间戳
-    for i, pred in enumerate(pred_timestamps):
-        best_iou = 0
+    for i in range(len(pred_starts)):
+        pred_start = pred_starts[i]
+        pred_end = pred_ends[i]
+        best_iou = 0.0
         best_j = -1
         
-        for j, gt in enumerate(gt_timestamps):
+        for j in range(candidate_lo[i], candidate_hi[i]):
             if gt_matched[j]:
                 continue
             
-            iou = calculate_iou(pred['start'], pred['end'], gt['start'], gt['end'])
+            gt_start = gt_starts[j]
+            gt_end = gt_ends[j]
+            intersection = max(0.0, min(pred_end, gt_end) - max(pred_start, gt_start))
+            union = max(pred_end, gt_end) - min(pred_start, gt_start)
+            iou = 0.0 if union == 0 else intersection / union
             if iou > best_iou:
                 best_iou = iou
                 best_j = j
         
         if best_iou >= iou_threshold and best_j >= 0:
-            pred_matched[i] = True
             gt_matched[best_j] = True
+            tp += 1
+    
+    return tp
+
+
+if NUMBA_AVAILABLE:
+    _match_kernel_njit = njit(cache=True)(_match_kernel)
+
+
+def match_timestamps(pred_timestamps: List[Dict[str, float]], 
+                    gt_timestamps: List[Dict[str, float]],
+                    iou_threshold: float = 0.5) -> Tuple[int, int, int]:
+    """
+    匹配预测时间戳和真实时间戳
+    
+    Args:
+        pred_timestamps: 预测的时间戳列表（也可以是 (N, 2) 的 [start, end] 数组）
+        gt_timestamps: 真实的时间戳列表（也可以是SubtitleParser返回的记录数组）
+        iou_threshold: IoU阈值，超过此值视为匹配
+        
+    Returns:
+        Tuple[int, int, int]: (真正例, 假正例, 假负例)
+            TP: 预测正确的数量
+            FP: 预测错误的数量（多余的预测）
+            FN: 漏检的数量（未预测到的真实标注）
+    """
+    pred_starts, pred_ends = _start_end_arrays(pred_timestamps)
+    gt_starts, gt_ends = _start_end_arrays(gt_timestamps)
+    
+    # 真实时间戳按起始时间排序（SubtitleParser的结果已排序，稳定排序不改变其顺序）
+    order = np.argsort(gt_starts, kind='stable')
+    gt_starts = gt_starts[order]
+    gt_ends = gt_ends[order]
+    
+    # 与预测 [s, e] 可能重叠的真实时间戳是一段连续区间：
+    # 之前的结束时间（前缀最大值）都早于s，之后的起始时间都晚于e
+    candidate_lo = np.searchsorted(np.maximum.accumulate(gt_ends), pred_starts, side='left')
+    candidate_hi = np.searchsorted(gt_starts, pred_ends, side='right')
+    
+    if NUMBA_AVAILABLE:
+        tp = _match_kernel_njit(pred_starts, pred_ends, gt_starts, gt_ends,
+                                candidate_lo, candidate_hi, iou_threshold)
+    else:
+        tp = _match_kernel(pred_starts.tolist(), pred_ends.tolist(),
+                           gt_starts.tolist(), gt_ends.tolist(),
+                           candidate_lo.tolist(), candidate_hi.tolist(), iou_threshold)
     
-    tp = sum(pred_matched)  # 真正例：成功匹配的预测
-    fp = len(pred_timestamps) - tp  # 假正例：未匹配的预测
-    fn = len(gt_timestamps) - sum(gt_matched)  # 假负例：未匹配的真实标注
+    fp = len(pred_starts) - tp  # 假正例：未匹配的预测
+    fn = len(gt_starts) - tp  # 假负例：未匹配的真实标注（每次匹配各占用一个预测和一个真实标注）
     
     return tp, fp, fn
 
@@ -107,8 +191,8 @@ def evaluate_vad_performance(pred_timestamps: List[Dict[str, float]],
     评估VAD性能
     
     Args:
-        pred_timestamps: 预测的时间戳列表
-        gt_timestamps: 真实的时间戳列表
+        pred_timestamps: 预测的时间戳列表，或 (N, 2) 的 [start, end] 数组
+        gt_timestamps: 真实的时间戳列表或记录数组
         iou_threshold: IoU阈值
         
     Returns:
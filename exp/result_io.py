@@ -0,0 +1,34 @@
+"""
+实验结果读写
+优先使用orjson序列化实验结果，不可用时回退到标准库json
+"""
+import json
+from pathlib import Path
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def save_results_json(results: dict, output_file: Path):
+    """
+    将实验结果保存为JSON文件（UTF-8，缩进2格）
+
+    orjson可以直接序列化NumPy数组和标量，并支持非字符串键（如threshold浮点数）
+
+    Args:
+        results: 实验结果字典
+        output_file: 输出文件路径
+    """
+    output_file = Path(output_file)
+
+    if ORJSON_AVAILABLE:
+        output_file.write_bytes(orjson.dumps(
+            results,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
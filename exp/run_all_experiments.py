@@ -10,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from exp1_threshold import ThresholdExperiment
 from exp2_min_silence import MinSilenceExperiment
 from exp3_merge_min_gap import MergeMinGapExperiment
+from vad_analyzer import VADResultCache
 
 
 def main():
@@ -41,6 +42,10 @@ def main():
     
     results = {}
     
+    # 实验1和实验3共用VAD结果缓存：实验1计算的语音概率可直接用于实验3，
+    # 实验3只需按其参数重新生成时间戳（实验2只分析字幕，不运行VAD）
+    vad_cache = VADResultCache(Path(args.results_dir) / 'vad_cache')
+    
     # 实验1: threshold优化
     if '1' in experiments_to_run:
         print("\n" + "▶" * 40)
@@ -48,7 +53,7 @@ def main():
         print("▶" * 40 + "\n")
         
         try:
-            exp1 = ThresholdExperiment(args.data_dir, args.results_dir)
+            exp1 = ThresholdExperiment(args.data_dir, args.results_dir, vad_cache=vad_cache)
             results['exp1'] = exp1.run_experiment()
             print("\n✓ 实验1完成")
         except Exception as e:
@@ -78,7 +83,7 @@ def main():
         print("▶" * 40 + "\n")
         
         try:
-            exp3 = MergeMinGapExperiment(args.data_dir, args.results_dir)
+            exp3 = MergeMinGapExperiment(args.data_dir, args.results_dir, vad_cache=vad_cache)
             
             # 如果实验1已运行，使用其最优threshold
             threshold = 0.5
@@ -2,14 +2,98 @@
 字幕文件解析器
 支持解析ASS、SRT等格式的字幕文件，提取时间戳
 """
+import mmap
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple
 
+import numpy as np
 
+
+# ASS文件通过mmap按字节扫描，以下两个模式均为bytes模式
+# [Events] 段落标记
+_ASS_EVENTS_RE = re.compile(rb'^[ \t]*\[Events\]', re.MULTILINE)
+
+# Dialogue行的起止时间，格式: Dialogue: Layer,H:MM:SS.cc,H:MM:SS.cc,...
+_ASS_DIALOGUE_RE = re.compile(
+    rb'^[ \t]*Dialogue:[^,\n]*,'
+    rb'[ \t]*(\d+):(\d+):(\d+)(?:\.(\d+))?[ \t]*,'
+    rb'[ \t]*(\d+):(\d+):(\d+)(?:\.(\d+))?[ \t]*,',
+    re.MULTILINE
+)
+
+# SRT时间行，格式: 00:02:30.500 --> 00:02:33.100（毫秒前的逗号在解析前已替换为点）
+_SRT_TIME_RE = re.compile(
+    r'^[ \t]*(\d+):(\d+):(\d+(?:\.\d*)?)[ \t]*-->'
+    r'[ \t]*(\d+):(\d+):(\d+(?:\.\d*)?)',
+    re.MULTILINE
+)
+
+
+def ass_times_to_seconds(hours, minutes, seconds, centiseconds) -> np.ndarray:
+    """
+    批量将ASS时间的各个字段转换为秒
+    
+    Args:
+        hours: 小时字符串（或字节串）序列
+        minutes: 分钟字符串（或字节串）序列
+        seconds: 秒字符串（或字节串）序列
+        centiseconds: 百分之一秒字符串（或字节串）序列，缺省时为None或空
+        
+    Returns:
+        np.ndarray: 秒数数组
+    """
+    whole = (np.array(hours, dtype=np.int64) * 3600
+             + np.array(minutes, dtype=np.int64) * 60
+             + np.array(seconds, dtype=np.int64))
+    cs = np.array([c or '0' for c in centiseconds], dtype=np.int64)
+    return whole + cs / 100.0
+
+
+def srt_times_to_seconds(hours, minutes, seconds) -> np.ndarray:
+    """
+    批量将SRT时间的各个字段转换为秒
+    
+    Args:
+        hours: 小时字符串序列
+        minutes: 分钟字符串序列
+        seconds: 秒字符串序列（可带以点分隔的毫秒部分，例如 "30.500"）
+        
+    Returns:
+        np.ndarray: 秒数数组
+    """
+    whole = (np.array(hours, dtype=np.int64) * 3600
+             + np.array(minutes, dtype=np.int64) * 60)
+    return whole + np.array(seconds, dtype=np.float64)
+
+
+def make_timestamps(starts, ends) -> np.recarray:
+    """
+    由起止时间构造按起始时间排序的时间戳记录数组
+    
+    Args:
+        starts: 起始时间序列（秒）
+        ends: 结束时间序列（秒）
+        
+    Returns:
+        np.recarray: 字段为start、end的记录数组，可用 ts.start / ts['start'] 按列访问
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    # 字幕文件中的事件通常已按时间排列，此时无需排序（稳定排序不会改变其顺序）
+    if not np.all(starts[1:] >= starts[:-1]):
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+    return np.rec.fromarrays([starts, ends], names='start,end')
+
+
+@lru_cache(maxsize=65536)
 def ass_time_to_seconds(time_str: str) -> float:
     """
-    将ASS时间格式转换为秒
+    将ASS时间格式转换为秒（单个时间，批量转换见ass_times_to_seconds）
+    
+    结果按输入字符串缓存
     
     Args:
         time_str: ASS格式时间字符串，例如 "0:02:30.50"
@@ -17,19 +101,18 @@ def ass_time_to_seconds(time_str: str) -> float:
     Returns:
         float: 秒数
     """
-    parts = time_str.split(':')
-    hours = int(parts[0])
-    minutes = int(parts[1])
-    sec_parts = parts[2].split('.')
-    seconds = int(sec_parts[0])
-    centiseconds = int(sec_parts[1]) if len(sec_parts) > 1 else 0
-    
-    return hours * 3600 + minutes * 60 + seconds + centiseconds / 100.0
+    hours, minutes, rest = time_str.split(':')
+    seconds, _, centiseconds = rest.partition('.')
+    return (int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+            + (int(centiseconds) if centiseconds else 0) / 100.0)
 
 
+@lru_cache(maxsize=65536)
 def srt_time_to_seconds(time_str: str) -> float:
     """
-    将SRT时间格式转换为秒
+    将SRT时间格式转换为秒（单个时间，批量转换见srt_times_to_seconds）
+    
+    结果按输入字符串缓存
     
     Args:
         time_str: SRT格式时间字符串，例如 "00:02:30,500"
@@ -37,28 +120,23 @@ def srt_time_to_seconds(time_str: str) -> float:
     Returns:
         float: 秒数
     """
-    time_str = time_str.replace(',', '.')
-    parts = time_str.split(':')
-    hours = int(parts[0])
-    minutes = int(parts[1])
-    seconds = float(parts[2])
-    
-    return hours * 3600 + minutes * 60 + seconds
+    hours, minutes, seconds = time_str.replace(',', '.').split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
 
 class SubtitleParser:
     """字幕解析器基类"""
     
     @staticmethod
-    def parse_file(file_path: str) -> List[Dict[str, float]]:
+    def parse_file(file_path: str) -> np.recarray:
         """
-        解析字幕文件，返回时间戳列表
+        解析字幕文件，返回时间戳数组
         
         Args:
             file_path: 字幕文件路径
             
         Returns:
-            List[Dict]: 时间戳列表，格式 [{'start': float, 'end': float}, ...]
+            np.recarray: 按起始时间排序的时间戳数组，字段为start、end（秒）
         """
         path = Path(file_path)
         suffix = path.suffix.lower()
@@ -71,7 +149,7 @@ class SubtitleParser:
             raise ValueError(f"不支持的字幕格式: {suffix}")
     
     @staticmethod
-    def parse_ass(file_path: str) -> List[Dict[str, float]]:
+    def parse_ass(file_path: str) -> np.recarray:
         """
         解析ASS字幕文件
         
@@ -79,33 +157,33 @@ class SubtitleParser:
             file_path: ASS文件路径
             
         Returns:
-            List[Dict]: 时间戳列表
+            np.recarray: 时间戳数组，字段为start、end
         """
-        timestamps = []
-        
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            lines = f.readlines()
-        
-        in_events = False
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('[Events]'):
-                in_events = True
-                continue
+        # 直接在mmap上按字节匹配，只复制捕获到的时间字段，不解码整个文件
+        with open(file_path, 'rb') as f:
+            # 空文件无法mmap
+            if os.fstat(f.fileno()).st_size == 0:
+                return make_timestamps([], [])
             
-            if in_events and line.startswith('Dialogue:'):
-                # ASS格式: Dialogue: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text
-                parts = line.split(',', 9)
-                if len(parts) >= 3:
-                    start_time = ass_time_to_seconds(parts[1].strip())
-                    end_time = ass_time_to_seconds(parts[2].strip())
-                    timestamps.append({'start': start_time, 'end': end_time})
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # 只解析[Events]之后的Dialogue行
+                events = _ASS_EVENTS_RE.search(mm)
+                if events is None:
+                    return make_timestamps([], [])
+                
+                matches = [m.groups() for m in _ASS_DIALOGUE_RE.finditer(mm, events.end())]
+        
+        if not matches:
+            return make_timestamps([], [])
         
-        return sorted(timestamps, key=lambda x: x['start'])
+        # 按列批量转换时间
+        columns = list(zip(*matches))
+        starts = ass_times_to_seconds(*columns[0:4])
+        ends = ass_times_to_seconds(*columns[4:8])
+        return make_timestamps(starts, ends)
     
     @staticmethod
-    def parse_srt(file_path: str) -> List[Dict[str, float]]:
+    def parse_srt(file_path: str) -> np.recarray:
         """
         解析SRT字幕文件
         
@@ -113,68 +191,52 @@ class SubtitleParser:
             file_path: SRT文件路径
             
         Returns:
-            List[Dict]: 时间戳列表
+            np.recarray: 时间戳数组，字段为start、end
         """
-        timestamps = []
-        
+        # 毫秒前的逗号统一替换为点，秒字段即可由NumPy直接批量转换为浮点数
         with open(file_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-        
-        # SRT格式使用空行分隔每个字幕块
-        blocks = content.strip().split('\n\n')
+            content = f.read().replace(',', '.')
         
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 2:
-                # 第二行是时间戳，格式: 00:02:30,500 --> 00:02:33,100
-                time_line = lines[1]
-                match = re.match(r'(\S+)\s*-->\s*(\S+)', time_line)
-                if match:
-                    start_str, end_str = match.groups()
-                    start_time = srt_time_to_seconds(start_str)
-                    end_time = srt_time_to_seconds(end_str)
-                    timestamps.append({'start': start_time, 'end': end_time})
+        # 直接在全文中扫描时间行，不再按空行拆分字幕块
+        matches = _SRT_TIME_RE.findall(content)
+        if not matches:
+            return make_timestamps([], [])
         
-        return sorted(timestamps, key=lambda x: x['start'])
+        # 按列批量转换时间
+        columns = list(zip(*matches))
+        starts = srt_times_to_seconds(*columns[0:3])
+        ends = srt_times_to_seconds(*columns[3:6])
+        return make_timestamps(starts, ends)
     
     @staticmethod
-    def extract_gaps(timestamps: List[Dict[str, float]]) -> List[float]:
+    def extract_gaps(timestamps: np.recarray) -> np.ndarray:
         """
         提取相邻字幕之间的间隔
         
         Args:
-            timestamps: 时间戳列表
+            timestamps: 按起始时间排序的时间戳数组
             
         Returns:
-            List[float]: 间隔列表（秒）
+            np.ndarray: 间隔数组（秒）
         """
-        gaps = []
-        for i in range(len(timestamps) - 1):
-            gap = timestamps[i + 1]['start'] - timestamps[i]['end']
-            if gap > 0:  # 排除重叠和零间隔
-                gaps.append(gap)
-        return gaps
+        gaps = timestamps.start[1:] - timestamps.end[:-1]
+        return gaps[gaps > 0]  # 排除重叠和零间隔
     
     @staticmethod
-    def find_merged_timestamps(timestamps: List[Dict[str, float]], 
-                               tolerance: float = 0.05) -> List[float]:
+    def find_merged_timestamps(timestamps: np.recarray, 
+                               tolerance: float = 0.05) -> np.ndarray:
         """
         找到首尾相连的字幕的连接点时间戳
         
         Args:
-            timestamps: 时间戳列表
+            timestamps: 按起始时间排序的时间戳数组
             tolerance: 容差（秒），小于此值视为相连
             
         Returns:
-            List[float]: 连接点时间戳列表
+            np.ndarray: 连接点时间戳数组（即前一条字幕的end时间）
         """
-        merge_points = []
-        for i in range(len(timestamps) - 1):
-            gap = timestamps[i + 1]['start'] - timestamps[i]['end']
-            if abs(gap) <= tolerance:
-                # 首尾相连，记录连接点（A的end时间）
-                merge_points.append(timestamps[i]['end'])
-        return merge_points
+        gaps = timestamps.start[1:] - timestamps.end[:-1]
+        return timestamps.end[:-1][np.abs(gaps) <= tolerance]
 
 
 if __name__ == '__main__':
@@ -3,9 +3,13 @@ VAD分析器
 用于分析Silero VAD的原始输出概率值和时间戳
 直接使用src模块的VAD处理器
 """
+import copy
 import torch
+import hashlib
 import numpy as np
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 import sys
 
@@ -13,17 +17,243 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 try:
-    from vad import VADProcessor
+    from vad import (VADProcessor, probs_to_timestamps, quantize_speech_probs, timestamps_to_array,
+                     threshold_on_prob_grid)
+    from vad.vad_processor import read_audio
     from util import AudioExtractor
     SILERO_AVAILABLE = True
 except ImportError:
     SILERO_AVAILABLE = False
     print("警告: VAD模块不可用")
 
+# 缓存键包含模型版本，升级silero-vad后旧缓存自动失效
+try:
+    from importlib.metadata import version as _package_version
+    SILERO_VERSION = _package_version('silero-vad')
+except Exception:
+    SILERO_VERSION = 'unknown'
+
+
+@lru_cache(maxsize=4096)
+def _file_sha1(path: str, size: int, mtime_ns: int) -> str:
+    """
+    计算整个文件内容的SHA1
+    
+    按 (路径, 大小, 修改时间) 缓存，同一文件在一次运行中只读取一次；
+    文件被改写后大小或修改时间变化，会重新计算
+    
+    Args:
+        path: 文件的绝对路径
+        size: 文件大小（仅用作缓存键）
+        mtime_ns: 文件修改时间（仅用作缓存键）
+        
+    Returns:
+        str: 十六进制SHA1
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        block = f.read(1 << 20)
+        while block:
+            sha1.update(block)
+            block = f.read(1 << 20)
+    return sha1.hexdigest()
+
+
+def audio_cache_key(audio_path: str, *extra) -> str:
+    """
+    计算音频文件的缓存键
+    
+    由整个音频文件内容的SHA1和extra中的参数（采样率、模型版本、VAD参数等）计算；
+    缓存由各实验共用，因此键只取决于文件内容，开头相同（如片头、静音）的不同文件不会冲突
+    
+    Args:
+        audio_path: 音频文件路径
+        *extra: 其他影响结果的参数
+        
+    Returns:
+        str: 十六进制缓存键
+    """
+    path = Path(audio_path).resolve()
+    stat = path.stat()
+    sha1 = hashlib.sha1(_file_sha1(str(path), stat.st_size, stat.st_mtime_ns).encode())
+    sha1.update(('|' + '|'.join(str(part) for part in extra)).encode())
+    return sha1.hexdigest()
+
+
+class VADResultCache:
+    """
+    VAD结果缓存，供各实验共用
+    
+    保存两类结果，均以audio_cache_key计算的键命名：
+    - 语音概率（<key>.npz，uint8量化），可对任意阈值重新生成时间戳
+    - 语音片段（segments_<key>.npy，(N, 2)的float64数组），对应一组具体的VAD参数；
+      文件未压缩，读取时以只读内存映射打开
+    读取时先查内存（LRU），再查磁盘；写入时同时写入两者
+    """
+    
+    def __init__(self, cache_dir, max_memory_items: int = 64):
+        """
+        初始化缓存
+        
+        Args:
+            cache_dir: 磁盘缓存目录
+            max_memory_items: 内存中最多保留的结果数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+    
+    def __getstate__(self):
+        # 传给子进程时只传磁盘目录，不复制内存中的结果
+        state = self.__dict__.copy()
+        state['_memory'] = OrderedDict()
+        return state
+    
+    def get_probs(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        读取语音概率
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[Tuple[np.ndarray, int]]: (uint8量化的语音概率, 音频样本数)，未命中时为None
+        """
+        def load(data):
+            speech_probs = data['probs']
+            # 兼容未量化的旧缓存
+            if speech_probs.dtype != np.uint8:
+                speech_probs = quantize_speech_probs(speech_probs)
+            return speech_probs, int(data['audio_length_samples'])
+        
+        return self._get(f"{key}.npz", load)
+    
+    def put_probs(self, key: str, speech_probs: np.ndarray, audio_length_samples: int):
+        """
+        写入语音概率（未量化的概率会先量化为uint8）
+        
+        Args:
+            key: 缓存键
+            speech_probs: 语音概率数组
+            audio_length_samples: 音频样本数
+        """
+        if speech_probs.dtype != np.uint8:
+            speech_probs = quantize_speech_probs(speech_probs)
+        self._put(f"{key}.npz", (speech_probs, audio_length_samples),
+                  probs=speech_probs, audio_length_samples=audio_length_samples)
+    
+    def get_segments(self, key: str) -> Optional[List[Dict[str, float]]]:
+        """
+        读取语音片段
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[List[Dict]]: 时间戳列表，未命中时为None
+        """
+        segments = self.get_segments_array(key)
+        if segments is None:
+            return None
+        return segments_to_timestamps(segments)
+    
+    def get_segments_array(self, key: str) -> Optional[np.ndarray]:
+        """
+        以数组形式读取语音片段，磁盘上的文件以只读内存映射方式打开
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[np.ndarray]: 形状为(N, 2)的float64数组，每行为(start, end)，未命中时为None
+        """
+        return self._get(f"segments_{key}.npy", None)
+    
+    def put_segments(self, key: str, timestamps):
+        """
+        写入语音片段
+        
+        Args:
+            key: 缓存键
+            timestamps: 时间戳列表，或形状为(N, 2)的(start, end)数组
+        """
+        segments = timestamps_to_segments(timestamps)
+        self._put(f"segments_{key}.npy", segments, segments)
+    
+    def _get(self, name: str, load):
+        """
+        依次查找内存和磁盘，磁盘命中时放入内存
+        
+        load为None时按.npy以只读内存映射读取，否则由load从np.load打开的npz中取值
+        """
+        if name in self._memory:
+            self._memory.move_to_end(name)
+            return self._memory[name]
+        
+        path = self.cache_dir / name
+        try:
+            if path.exists():
+                if load is None:
+                    value = np.load(path, mmap_mode='r')
+                else:
+                    with np.load(path) as data:
+                        value = load(data)
+                self._remember(name, value)
+                return value
+        except Exception as e:
+            print(f"警告: 读取VAD缓存失败 {path}: {e}")
+        return None
+    
+    def _put(self, name: str, value, array=None, **arrays):
+        """
+        写入内存和磁盘，磁盘写入失败时只打印警告
+        
+        给出array时保存为未压缩的.npy（可内存映射），否则将arrays保存为压缩的npz
+        """
+        self._remember(name, value)
+        path = self.cache_dir / name
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if array is not None:
+                np.save(path, array)
+            else:
+                np.savez_compressed(path, **arrays)
+        except Exception as e:
+            print(f"警告: 写入VAD缓存失败 {path}: {e}")
+    
+    def _remember(self, name: str, value):
+        self._memory[name] = value
+        self._memory.move_to_end(name)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+
+def timestamps_to_segments(timestamps) -> np.ndarray:
+    """
+    将时间戳列表转换为(N, 2)的(start, end)数组
+    
+    保持float64：VAD返回的秒数已四舍五入到0.1秒，转为float32会改变其数值
+    
+    Args:
+        timestamps: 时间戳列表，或已是(N, 2)数组
+        
+    Returns:
+        np.ndarray: 形状为(N, 2)的float64数组
+    """
+    if isinstance(timestamps, np.ndarray):
+        return np.asarray(timestamps, dtype=np.float64).reshape(-1, 2)
+    return timestamps_to_array(timestamps, dtype=np.float64)
+
+
+def segments_to_timestamps(segments: np.ndarray) -> List[Dict[str, float]]:
+    """将(N, 2)的(start, end)数组转换回时间戳列表"""
+    return [{'start': start, 'end': end} for start, end in segments.tolist()]
+
 
 def extract_audio_from_video(video_path: str, output_wav: str, 
                              ffmpeg_path: str = "ffmpeg",
-                             sample_rate: int = 16000) -> bool:
+                             sample_rate: int = 16000,
+                             threads: int = None) -> bool:
     """
     从视频文件中提取音频
     
@@ -32,18 +262,42 @@ def extract_audio_from_video(video_path: str, output_wav: str,
         output_wav: 输出WAV文件路径
         ffmpeg_path: FFmpeg可执行文件路径
         sample_rate: 采样率
+        threads: FFmpeg解码线程数，None表示由FFmpeg自动决定
         
     Returns:
         bool: 是否成功
     """
     try:
         extractor = AudioExtractor(ffmpeg_path=ffmpeg_path)
-        return extractor.extract_audio(video_path, output_wav, sample_rate)
+        return extractor.extract_audio(video_path, output_wav, sample_rate, threads=threads)
     except Exception as e:
         print(f"音频提取失败: {e}")
         return False
 
 
+def extract_audio_from_videos(video_paths: List[str], output_wavs: List[str],
+                              ffmpeg_path: str = "ffmpeg",
+                              sample_rate: int = 16000) -> bool:
+    """
+    在一次FFmpeg调用中从多个视频文件中提取音频
+    
+    Args:
+        video_paths: 视频文件路径列表
+        output_wavs: 输出WAV文件路径列表，与video_paths一一对应
+        ffmpeg_path: FFmpeg可执行文件路径
+        sample_rate: 采样率
+        
+    Returns:
+        bool: 是否全部成功
+    """
+    try:
+        extractor = AudioExtractor(ffmpeg_path=ffmpeg_path)
+        return extractor.extract_audio_batch(video_paths, output_wavs, sample_rate)
+    except Exception as e:
+        print(f"批量音频提取失败: {e}")
+        return False
+
+
 class VADAnalyzer:
     """VAD分析器，使用src/vad模块"""
     
@@ -51,7 +305,13 @@ class VADAnalyzer:
                  min_speech_duration_ms: int = 250,
                  max_speech_duration_s: float = 15.0,
                  min_silence_duration_ms: int = 1000,
-                 speech_pad_ms: int = 30):
+                 speech_pad_ms: int = 30,
+                 onnx_model_path: str = None,
+                 intra_op_threads: int = None,
+                 batch_size: int = 1,
+                 execution_provider: str = 'cpu',
+                 device: str = None,
+                 vad_processor: 'VADProcessor' = None):
         """
         初始化VAD分析器
         
@@ -62,52 +322,301 @@ class VADAnalyzer:
             max_speech_duration_s: 最大语音持续时间
             min_silence_duration_ms: 最小静音持续时间
             speech_pad_ms: 语音前后填充时间
+            onnx_model_path: 自定义ONNX模型文件路径（如int8量化模型），为None时使用自带模型
+            intra_op_threads: ONNX Runtime算子内线程数，为None时使用默认设置（单线程）
+            batch_size: 大于1时detect_speech对长音频分段批量推理（结果略有差异）；
+                        语音概率及带缓存的检测始终逐窗口推理
+            execution_provider: ONNX模型的执行提供程序，cpu / openvino / coreml / cuda / dml
+            device: PyTorch模型（use_onnx=False）的推理设备，为None时有CUDA则使用GPU
+            vad_processor: 已创建的VAD处理器，给出时直接使用（不再加载模型），忽略上面的参数
         """
         if not SILERO_AVAILABLE:
             raise ImportError("VAD模块不可用")
         
-        self.vad_processor = VADProcessor(
-            use_onnx=use_onnx,
-            threshold=threshold,
-            min_speech_duration_ms=min_speech_duration_ms,
-            max_speech_duration_s=max_speech_duration_s,
-            min_silence_duration_ms=min_silence_duration_ms,
-            speech_pad_ms=speech_pad_ms
-        )
+        if vad_processor is None:
+            vad_processor = VADProcessor(
+                use_onnx=use_onnx,
+                threshold=threshold,
+                min_speech_duration_ms=min_speech_duration_ms,
+                max_speech_duration_s=max_speech_duration_s,
+                min_silence_duration_ms=min_silence_duration_ms,
+                speech_pad_ms=speech_pad_ms,
+                onnx_model_path=onnx_model_path,
+                intra_op_threads=intra_op_threads,
+                batch_size=batch_size,
+                execution_provider=execution_provider,
+                device=device
+            )
+        self.vad_processor = vad_processor
         self.sampling_rate = 16000
     
-    def detect_speech(self, audio_path: str) -> List[Dict[str, float]]:
+    @property
+    def model_tag(self) -> str:
+        """
+        模型标识，用于磁盘缓存的键；不同模型的语音概率不同，不能共用缓存
+        
+        使用自定义模型时包含文件名和大小，以便替换模型文件后缓存自动失效；
+        不使用CPU推理时还包含执行提供程序或推理设备
+        """
+        vad = self.vad_processor
+        if vad.onnx_model_path:
+            path = Path(vad.onnx_model_path)
+            tag = f"onnx_model={path.name}:{path.stat().st_size}"
+        else:
+            tag = f"onnx={vad.use_onnx}"
+        # 其他执行提供程序的浮点结果可能与CPU略有不同
+        if vad.execution_provider != 'cpu':
+            tag += f",ep={vad.execution_provider}"
+        if vad.device.type != 'cpu':
+            tag += f",device={vad.device.type}"
+        return tag
+    
+    def detect_speech(self, audio_path: str, threshold: float = None,
+                      min_speech_duration_ms: int = None,
+                      max_speech_duration_s: float = None,
+                      min_silence_duration_ms: int = None) -> List[Dict[str, float]]:
         """
         检测语音片段
         
+        参数为None时使用分析器的配置；传入参数可以复用已加载的模型，无需为每组参数新建分析器
+        
         Args:
             audio_path: 音频文件路径
+            threshold: 语音检测阈值
+            min_speech_duration_ms: 最小语音持续时间
+            max_speech_duration_s: 最大语音持续时间
+            min_silence_duration_ms: 最小静音持续时间
             
         Returns:
             List[Dict]: 时间戳列表
         """
         return self.vad_processor.detect_speech(audio_path, 
                                                sampling_rate=self.sampling_rate,
-                                               return_seconds=True)
+                                               return_seconds=True,
+                                               threshold=threshold,
+                                               min_speech_duration_ms=min_speech_duration_ms,
+                                               max_speech_duration_s=max_speech_duration_s,
+                                               min_silence_duration_ms=min_silence_duration_ms)
+    
+    def detect_speech_cached(self, audio_path: str, cache,
+                             threshold: float = None,
+                             min_speech_duration_ms: int = None,
+                             max_speech_duration_s: float = None,
+                             min_silence_duration_ms: int = None,
+                             as_array: bool = False):
+        """
+        检测语音片段，结果按音频内容和VAD参数缓存
+        
+        参数与 detect_speech 相同；相同音频和参数再次检测时直接读取缓存，不运行模型。
+        若缓存中已有该音频的语音概率（如实验1的结果），且阈值落在量化刻度上，
+        则直接由语音概率生成时间戳
+        
+        Args:
+            audio_path: 音频文件路径
+            cache: VADResultCache，或缓存目录路径
+            threshold: 语音检测阈值
+            min_speech_duration_ms: 最小语音持续时间
+            max_speech_duration_s: 最大语音持续时间
+            min_silence_duration_ms: 最小静音持续时间
+            as_array: 为True时返回(N, 2)的(start, end)数组而不是字典列表
+            
+        Returns:
+            List[Dict] 或 np.ndarray: 时间戳列表
+        """
+        return self.detect_speech_batch_cached([audio_path], cache,
+                                               threshold=threshold,
+                                               min_speech_duration_ms=min_speech_duration_ms,
+                                               max_speech_duration_s=max_speech_duration_s,
+                                               min_silence_duration_ms=min_silence_duration_ms,
+                                               as_array=as_array)[0]
+    
+    def detect_speech_batch_cached(self, audio_paths: List[str], cache,
+                                   threshold: float = None,
+                                   min_speech_duration_ms: int = None,
+                                   max_speech_duration_s: float = None,
+                                   min_silence_duration_ms: int = None,
+                                   as_array: bool = False) -> list:
+        """
+        批量检测多个音频文件的语音片段，结果缓存方式与 detect_speech_cached 相同
+        
+        未命中缓存的文件作为同一批次一起推理（见 get_speech_probs_batch），
+        再由语音概率生成时间戳；推理得到的语音概率也写入缓存，供其他实验使用。
+        批量推理与逐个推理的语音概率不保证逐位相同（取决于执行提供程序和算子实现），
+        概率恰好落在阈值附近的窗口可能因此得到不同的片段；两种方式共用同一缓存，
+        先写入的结果会被另一种方式直接复用
+        
+        Args:
+            audio_paths: 音频文件路径列表
+            cache: VADResultCache，或缓存目录路径
+            threshold: 语音检测阈值
+            min_speech_duration_ms: 最小语音持续时间
+            max_speech_duration_s: 最大语音持续时间
+            min_silence_duration_ms: 最小静音持续时间
+            as_array: 为True时每个文件返回(N, 2)的(start, end)数组而不是字典列表，
+                命中缓存时即为缓存文件的只读内存映射，省去逐个构造字典
+            
+        Returns:
+            list: 每个文件的时间戳，与输入顺序一致
+        """
+        if not isinstance(cache, VADResultCache):
+            cache = VADResultCache(cache)
+        
+        params = self._resolve_vad_params(threshold, min_speech_duration_ms,
+                                          max_speech_duration_s, min_silence_duration_ms)
+        segment_keys = [self.segments_cache_key(path, params) for path in audio_paths]
+        results = [cache.get_segments_array(key) for key in segment_keys]
+        
+        # 量化概率只在阈值（及silero内部的neg_threshold）落在量化刻度上时与原始概率等价
+        reuse_probs = threshold_on_prob_grid(params[0])
+        
+        missing = []
+        for i, segments in enumerate(results):
+            if segments is not None:
+                continue
+            cached_probs = cache.get_probs(self.probs_cache_key(audio_paths[i])) if reuse_probs else None
+            if cached_probs is None:
+                missing.append(i)
+                continue
+            results[i] = timestamps_to_segments(self._timestamps_from_params(*cached_probs, params))
+            cache.put_segments(segment_keys[i], results[i])
+        
+        if missing:
+            batch_probs = self.get_speech_probs_batch([audio_paths[i] for i in missing])
+            for i, (speech_probs, audio_length_samples) in zip(missing, batch_probs):
+                results[i] = timestamps_to_segments(
+                    self._timestamps_from_params(speech_probs, audio_length_samples, params))
+                cache.put_segments(segment_keys[i], results[i])
+                cache.put_probs(self.probs_cache_key(audio_paths[i]), speech_probs, audio_length_samples)
+        
+        if as_array:
+            return results
+        return [segments_to_timestamps(segments) for segments in results]
+    
+    def probs_cache_key(self, audio_path: str) -> str:
+        """语音概率的缓存键（与VAD参数无关）"""
+        return audio_cache_key(audio_path, self.sampling_rate, self.model_tag, SILERO_VERSION)
+    
+    def segments_cache_key(self, audio_path: str, params: tuple) -> str:
+        """语音片段的缓存键，params为_resolve_vad_params返回的参数元组"""
+        return audio_cache_key(audio_path, self.sampling_rate, self.model_tag,
+                               SILERO_VERSION, *params)
+    
+    def _timestamps_from_params(self, speech_probs: np.ndarray, audio_length_samples: int,
+                                params: tuple) -> List[Dict[str, float]]:
+        """按_resolve_vad_params返回的参数元组由语音概率生成时间戳"""
+        return self.timestamps_from_probs(speech_probs, audio_length_samples,
+                                          threshold=params[0],
+                                          min_speech_duration_ms=params[1],
+                                          max_speech_duration_s=params[2],
+                                          min_silence_duration_ms=params[3])
+    
+    def _resolve_vad_params(self, threshold, min_speech_duration_ms,
+                            max_speech_duration_s, min_silence_duration_ms) -> tuple:
+        """用分析器的配置补全未指定的VAD参数，返回缓存键使用的参数元组"""
+        vad = self.vad_processor
+        return (
+            vad.threshold if threshold is None else threshold,
+            vad.min_speech_duration_ms if min_speech_duration_ms is None else min_speech_duration_ms,
+            vad.max_speech_duration_s if max_speech_duration_s is None else max_speech_duration_s,
+            vad.min_silence_duration_ms if min_silence_duration_ms is None else min_silence_duration_ms,
+            vad.speech_pad_ms
+        )
+    
+    def detect_speech_from_array(self, samples: np.ndarray, sample_rate: int = 16000,
+                                 return_seconds: bool = True) -> List[Dict[str, float]]:
+        """
+        从已加载到内存的音频数据检测语音片段，不再读取文件
+        
+        Args:
+            samples: 单声道float32音频数据
+            sample_rate: 采样率
+            return_seconds: 是否返回秒数
+            
+        Returns:
+            List[Dict]: 时间戳列表
+        """
+        wav = torch.from_numpy(np.ascontiguousarray(samples, dtype=np.float32))
+        return self.vad_processor.detect_speech_from_tensor(wav,
+                                                            sampling_rate=sample_rate,
+                                                            return_seconds=return_seconds)
+    
+    def get_speech_probs(self, audio_path: str) -> Tuple[np.ndarray, int]:
+        """
+        计算每个窗口的语音概率（模型推理部分）
+        
+        Args:
+            audio_path: 音频文件路径
+            
+        Returns:
+            Tuple[np.ndarray, int]: (语音概率数组, 音频样本数)
+        """
+        return self.vad_processor.get_speech_probs(audio_path,
+                                                   sampling_rate=self.sampling_rate)
+    
+    def get_speech_probs_batch(self, audio_paths: List[str]) -> List[Tuple[np.ndarray, int]]:
+        """
+        将多个音频文件作为一个批次计算语音概率
+        
+        Args:
+            audio_paths: 音频文件路径列表
+            
+        Returns:
+            List[Tuple[np.ndarray, int]]: 每个文件的 (语音概率数组, 音频样本数)
+        """
+        wavs = [read_audio(path, sampling_rate=self.sampling_rate) for path in audio_paths]
+        return self.vad_processor.get_speech_probs_batch(wavs, sampling_rate=self.sampling_rate)
+    
+    def timestamps_from_probs(self, speech_probs: np.ndarray, audio_length_samples: int,
+                              threshold: float = None,
+                              min_speech_duration_ms: int = None,
+                              min_silence_duration_ms: int = None,
+                              max_speech_duration_s: float = None) -> List[Dict[str, float]]:
+        """
+        根据缓存的语音概率生成时间戳，不重新运行模型
+        
+        Args:
+            speech_probs: get_speech_probs返回的语音概率数组
+            audio_length_samples: 音频样本数
+            threshold: 语音检测阈值，为None时使用分析器的配置
+            min_speech_duration_ms: 最小语音持续时间，为None时使用分析器的配置
+            min_silence_duration_ms: 最小静音持续时间，为None时使用分析器的配置
+            max_speech_duration_s: 最大语音持续时间，为None时使用分析器的配置
+            
+        Returns:
+            List[Dict]: 时间戳列表
+        """
+        vad = self.vad_processor
+        return probs_to_timestamps(
+            speech_probs,
+            audio_length_samples,
+            threshold=vad.threshold if threshold is None else threshold,
+            sampling_rate=self.sampling_rate,
+            min_speech_duration_ms=(vad.min_speech_duration_ms if min_speech_duration_ms is None
+                                    else min_speech_duration_ms),
+            max_speech_duration_s=(vad.max_speech_duration_s if max_speech_duration_s is None
+                                   else max_speech_duration_s),
+            min_silence_duration_ms=(vad.min_silence_duration_ms if min_silence_duration_ms is None
+                                     else min_silence_duration_ms),
+            speech_pad_ms=vad.speech_pad_ms,
+            return_seconds=True
+        )
     
     def create_with_threshold(self, threshold: float) -> 'VADAnalyzer':
         """
         创建使用指定阈值的新分析器实例
         
+        阈值只在由语音概率生成时间戳时使用，新实例与当前实例共享已加载的模型，
+        不会重新创建推理会话；模型带有RNN状态，两者不能在多个线程中同时使用
+        
         Args:
             threshold: 新的阈值
             
         Returns:
             VADAnalyzer: 新的分析器实例
         """
-        return VADAnalyzer(
-            use_onnx=self.vad_processor.use_onnx,
-            threshold=threshold,
-            min_speech_duration_ms=self.vad_processor.min_speech_duration_ms,
-            max_speech_duration_s=self.vad_processor.max_speech_duration_s,
-            min_silence_duration_ms=self.vad_processor.min_silence_duration_ms,
-            speech_pad_ms=self.vad_processor.speech_pad_ms
-        )
+        vad_processor = copy.copy(self.vad_processor)
+        vad_processor.threshold = threshold
+        return VADAnalyzer(vad_processor=vad_processor)
 
 
 if __name__ == '__main__':
@@ -125,7 +634,6 @@ if __name__ == '__main__':
     print("  analyzer = VADAnalyzer(threshold=0.5)")
     print("  timestamps = analyzer.detect_speech('audio.wav')")
     print("  ")
-    print("  # 使用不同阈值")
-    print("  analyzer2 = analyzer.create_with_threshold(0.3)")
-    print("  timestamps2 = analyzer2.detect_speech('audio.wav')")
+    print("  # 使用不同阈值（复用已加载的模型）")
+    print("  timestamps2 = analyzer.detect_speech('audio.wav', threshold=0.3)")
 
@@ -4,6 +4,7 @@
 """
 import os
 import sys
+from functools import cached_property
 from pathlib import Path
 
 # 添加父目录到路径以便导入util模块
@@ -13,7 +14,12 @@ from util.file_io import ConfigReader
 
 
 class Config:
-    """配置类"""
+    """
+    配置类
+    
+    各配置项的属性值在首次访问时计算并缓存；修改配置请使用 set，
+    它会同时清除已缓存的属性值
+    """
     
     def __init__(self, config_dict):
         """
@@ -23,6 +29,34 @@ class Config:
             config_dict: 配置字典
         """
         self._config = config_dict
+        self._flat = self._flatten(config_dict)
+    
+    @staticmethod
+    def _flatten(config_dict):
+        """
+        将嵌套的配置字典展开为 {点号路径: 配置值} 的查找表
+        
+        中间层级的字典也会收录，与逐级查找的结果一致；
+        非字符串或含点号的键无法用点号路径访问，不收录
+        
+        Args:
+            config_dict: 配置字典
+            
+        Returns:
+            dict: 点号路径到配置值的映射
+        """
+        flat = {}
+        stack = [('', config_dict)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                if not isinstance(key, str) or '.' in key:
+                    continue
+                path = prefix + key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + '.', value))
+        return flat
         
     def get(self, key_path, default=None):
         """
@@ -35,52 +69,70 @@ class Config:
         Returns:
             配置值
         """
-        keys = key_path.split('.')
-        value = self._config
+        return self._flat.get(key_path, default)
+    
+    def set(self, key_path, value):
+        """
+        设置配置值，支持点号分隔的路径，缺少的中间层级会自动创建
         
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
+        Args:
+            key_path: 配置键路径，例如 "paths.output_ass"
+            value: 配置值
+        """
+        keys = key_path.split('.')
+        node = self._config
+        for key in keys[:-1]:
+            if not isinstance(node.get(key), dict):
+                node[key] = {}
+            node = node[key]
+        node[keys[-1]] = value
+        self._flat = self._flatten(self._config)
         
-        return value
+        # 清除已缓存的属性值，下次访问时按新配置重新计算
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, cached_property):
+                self.__dict__.pop(name, None)
     
-    @property
+    @cached_property
     def input_file(self):
         return self.get('paths.input_file')
     
-    @property
+    @cached_property
     def output_wav(self):
         return self.get('paths.output_wav')
     
-    @property
+    @cached_property
     def output_ass(self):
         return self.get('paths.output_ass')
     
-    @property
+    @cached_property
     def sample_rate(self):
         return self.get('audio.sample_rate', 16000)
     
-    @property
+    @cached_property
     def ffmpeg_path(self):
        path = self.get('audio.ffmpeg_path', 'ffmpeg')
        # 如果配置文件中显式设置为None或空字符串，使用默认值'ffmpeg'
        return path if path else 'ffmpeg'
     
-    @property
+    @cached_property
+    def strict_ffmpeg_check(self):
+        """是否运行 ffmpeg -version 检查FFmpeg（默认只查找可执行文件）"""
+        return bool(self.get('audio.strict_ffmpeg_check', False))
+    
+    @cached_property
     def use_onnx(self):
         return self.get('vad.use_onnx', True)
     
-    @property
+    @cached_property
     def vad_threshold(self):
         return self.get('vad.threshold', 0.5)
     
-    @property
+    @cached_property
     def min_speech_duration_ms(self):
         return self.get('vad.min_speech_duration_ms', 250)
     
-    @property
+    @cached_property
     def max_speech_duration_s(self):
         value = self.get('vad.max_speech_duration_s', float('inf'))
         # 处理YAML中的.inf表示
@@ -88,40 +140,70 @@ class Config:
             return float('inf')
         return float(value)
     
-    @property
+    @cached_property
     def min_silence_duration_ms(self):
         return self.get('vad.min_silence_duration_ms', 100)
     
-    @property
+    @cached_property
     def speech_pad_ms(self):
         return self.get('vad.speech_pad_ms', 30)
     
-    @property
+    @cached_property
+    def vad_model_path(self):
+        """自定义ONNX模型文件路径，未设置时为None"""
+        return self.get('vad.model_path') or None
+    
+    @cached_property
+    def vad_int8(self):
+        """未指定model_path时是否使用models/silero_vad.int8.onnx"""
+        return bool(self.get('vad.int8', False))
+    
+    @cached_property
+    def vad_batch_size(self):
+        """长音频分段批量推理的批次大小，1为逐窗口推理"""
+        return self.get('vad.batch_size', 1)
+    
+    @cached_property
+    def vad_execution_provider(self):
+        """ONNX模型的执行提供程序：cpu / openvino / coreml / cuda / dml"""
+        return str(self.get('vad.execution_provider', 'cpu') or 'cpu').lower()
+    
+    @cached_property
+    def vad_device(self):
+        """PyTorch模型（use_onnx: false）的推理设备，未设置时为None（有CUDA时自动使用GPU）"""
+        return self.get('vad.device') or None
+    
+    @cached_property
+    def vad_intra_op_threads(self):
+        """ONNX Runtime算子内线程数，未设置时为None（单线程）"""
+        return self.get('vad.intra_op_threads')
+    
+    @cached_property
     def subtitle_title(self):
         return self.get('subtitle.title', '自动生成字幕')
     
-    @property
+    @cached_property
     def resolution(self):
         width = self.get('subtitle.resolution.width', 1280)
         height = self.get('subtitle.resolution.height', 720)
         return (width, height)
     
-    @property
+    @cached_property
     def merge_gap_threshold(self):
         """时间戳合并间隔阈值（秒）"""
         return self.get('subtitle.merge_gap_threshold', 1.0)
     
-    @property
+    @cached_property
     def merge_min_gap(self):
         """时间戳最小间隔（秒）"""
         return self.get('subtitle.merge_min_gap', 0.5)
     
-    @property
+    @cached_property
     def merge_max_duration(self):
         """单个字幕最大时长（秒）"""
         return self.get('subtitle.merge_max_duration', 15.0)
     
-    @property
+    @cached_property
     def style_config(self):
         """获取ASS样式配置"""
         style = self.get('subtitle.style', {})
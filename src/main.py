@@ -3,21 +3,21 @@
 
 功能流程：
 1. 读取配置文件
-2. 使用FFmpeg提取音频并转换为16kHz的wav文件
+2. 提取音频并转换为16kHz的单声道音频（安装了PyAV时在进程内解码，否则通过管道读取FFmpeg的输出）
 3. 使用Silero VAD检测语音片段
 4. 将检测结果转换为ASS格式并保存
 """
 import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加src目录到Python路径
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import load_config
-from util import AudioExtractor, seconds_to_ass_time, pre_process, ASSWriter
-from vad import VADProcessor
+from util import AudioExtractor, pre_process, ASSWriter
 
 
 class ASSGenerator:
@@ -31,6 +31,8 @@ class ASSGenerator:
             config: 配置对象
         """
         self.config = config
+        # 提取得到的音频数组，提取失败时为None
+        self._audio = None
         
     def generate(self):
         """
@@ -46,17 +48,29 @@ class ASSGenerator:
         # 步骤1: 音频提取
         print("\n[步骤 1/3] 音频提取")
         print("-" * 60)
-        if not self._extract_audio():
+        # 输入文件不存在或没有音轨时直接失败，此时还没有开始加载VAD模型
+        if not self._check_input():
             print("错误: 音频提取失败")
             return False
         
-        # 步骤2: 语音检测
-        print("\n[步骤 2/3] 语音活动检测")
-        print("-" * 60)
-        timestamps = self._detect_speech()
-        if timestamps is None or len(timestamps) == 0:
-            print("警告: 未检测到语音片段")
-            return False
+        # VAD模型加载（导入torch、创建推理会话）与音频提取互不依赖，放到后台线程中同时进行；
+        # 不使用with语句：提前返回时不必等待后台的模型加载完成
+        executor = ThreadPoolExecutor(max_workers=1)
+        vad_future = executor.submit(self._create_vad_processor)
+        try:
+            if not self._extract_audio():
+                print("错误: 音频提取失败")
+                return False
+            
+            # 步骤2: 语音检测
+            print("\n[步骤 2/3] 语音活动检测")
+            print("-" * 60)
+            timestamps = self._detect_speech(vad_future)
+            if timestamps is None or len(timestamps) == 0:
+                print("警告: 未检测到语音片段")
+                return False
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         # 步骤3: 生成ASS文件
         print("\n[步骤 3/3] 生成ASS字幕文件")
@@ -71,79 +85,140 @@ class ASSGenerator:
         print("=" * 60)
         return True
     
-    def _extract_audio(self):
+    def _check_input(self):
         """
-        提取音频
+        检查输入文件是否存在、是否包含音轨（不解码音频）
         
         Returns:
-            bool: 是否成功
+            bool: 是否可以继续提取音频
         """
         input_file = self.config.input_file
-        output_wav = self.config.output_wav
-        sample_rate = self.config.sample_rate
         
         print(f"输入文件: {input_file}")
-        print(f"输出WAV: {output_wav}")
-        print(f"采样率: {sample_rate}Hz")
+        print(f"输出WAV: {self.config.output_wav}")
+        print(f"采样率: {self.config.sample_rate}Hz")
         
         # 检查输入文件是否存在
         if not os.path.exists(input_file):
             print(f"错误: 输入文件不存在: {input_file}")
             return False
         
+        # 没有音轨时直接失败，不再进行解码或改用FFmpeg重试
+        if AudioExtractor.has_audio_stream(input_file) is False:
+            print(f"错误: 文件中没有音轨: {input_file}")
+            return False
+        
+        return True
+    
+    def _extract_audio(self):
+        """
+        提取音频（输入文件已由 _check_input 检查）
+        
+        Returns:
+            bool: 是否成功
+        """
+        input_file = self.config.input_file
+        output_wav = self.config.output_wav
+        sample_rate = self.config.sample_rate
+        
         # 创建音频提取器
         extractor = AudioExtractor(ffmpeg_path=self.config.ffmpeg_path)
         
+        # 安装了PyAV时在进程内解码，音频数组直接交给VAD；
+        # 只有配置了输出WAV路径时才另外保存wav文件
+        if extractor.check_av_available():
+            try:
+                self._audio = extractor.extract_audio_array(input_file, sample_rate,
+                                                            output_path=output_wav)
+                return True
+            except Exception as e:
+                print(f"警告: 进程内解码失败，改用FFmpeg: {str(e)}")
+                self._audio = None
+        
         # 检查FFmpeg是否可用
-        if not extractor.check_ffmpeg_available():
+        if not extractor.check_ffmpeg_available(strict=self.config.strict_ffmpeg_check):
             print("错误: FFmpeg不可用，请确保已安装FFmpeg并添加到系统PATH")
             return False
         
         try:
-            # 提取音频
-            extractor.extract_audio(input_file, output_wav, sample_rate)
+            # 通过管道读取FFmpeg输出的PCM，同样直接交给VAD，不再从磁盘读回wav文件
+            self._audio = extractor.extract_audio_pcm(input_file, sample_rate,
+                                                      output_path=output_wav)
             return True
         except Exception as e:
             print(f"错误: {str(e)}")
             return False
     
-    def _detect_speech(self):
+    def _create_vad_processor(self):
+        """
+        根据配置创建VAD处理器（加载模型）
+        
+        Returns:
+            VADProcessor: VAD处理器
+        """
+        # VAD模块依赖torch，导入较慢，只在需要检测语音时导入
+        from vad import VADProcessor, INT8_MODEL_PATH
+        
+        # 模型文件：显式指定的路径优先，其次是int8量化模型
+        model_path = self.config.vad_model_path
+        if model_path is None and self.config.vad_int8:
+            if INT8_MODEL_PATH.exists():
+                model_path = str(INT8_MODEL_PATH)
+            else:
+                print(f"警告: 未找到int8模型 {INT8_MODEL_PATH}，使用自带模型")
+        
+        return VADProcessor(
+            use_onnx=self.config.use_onnx,
+            threshold=self.config.vad_threshold,
+            min_speech_duration_ms=self.config.min_speech_duration_ms,
+            max_speech_duration_s=self.config.max_speech_duration_s,
+            min_silence_duration_ms=self.config.min_silence_duration_ms,
+            speech_pad_ms=self.config.speech_pad_ms,
+            onnx_model_path=model_path,
+            intra_op_threads=self.config.vad_intra_op_threads,
+            batch_size=self.config.vad_batch_size,
+            execution_provider=self.config.vad_execution_provider,
+            device=self.config.vad_device
+        )
+    
+    def _detect_speech(self, vad_future=None):
         """
         检测语音片段
         
+        Args:
+            vad_future: 后台创建VAD处理器的Future，为None时在当前线程创建
+        
         Returns:
-            list: 语音时间戳列表（秒），如果失败返回None
+            np.ndarray: 形状为 (N, 2) 的语音时间戳数组（秒），如果失败返回None
         """
-        output_wav = self.config.output_wav
+        # 优先使用进程内解码得到的音频数组
+        audio = self._audio if self._audio is not None else self.config.output_wav
         
         # 检查音频文件是否存在
-        if not os.path.exists(output_wav):
-            print(f"错误: 音频文件不存在: {output_wav}")
+        if self._audio is None and not (audio and os.path.exists(audio)):
+            print(f"错误: 音频文件不存在: {audio}")
             return None
         
         try:
-            # 创建VAD处理器
-            vad = VADProcessor(
-                use_onnx=self.config.use_onnx,
-                threshold=self.config.vad_threshold,
-                min_speech_duration_ms=self.config.min_speech_duration_ms,
-                max_speech_duration_s=self.config.max_speech_duration_s,
-                min_silence_duration_ms=self.config.min_silence_duration_ms,
-                speech_pad_ms=self.config.speech_pad_ms
-            )
+            # 获取VAD处理器（模型加载中的异常在这里重新抛出）
+            if vad_future is not None:
+                vad = vad_future.result()
+            else:
+                vad = self._create_vad_processor()
             
-            # 检测语音
+            # 检测语音，结果为 (N, 2) 秒数数组，预处理和写入ASS都直接使用数组
             timestamps = vad.detect_speech(
-                output_wav,
+                audio,
                 sampling_rate=self.config.sample_rate,
-                return_seconds=True
+                return_seconds=True,
+                return_array=True
             )
             
             # 显示检测结果
             print(f"\n检测到 {len(timestamps)} 个语音片段:")
-            for i, ts in enumerate(timestamps[:5]):  # 只显示前5个
-                print(f"  片段 {i+1}: {ts['start']:.2f}s - {ts['end']:.2f}s "
-                      f"(持续 {ts['end']-ts['start']:.2f}s)")
+            for i, (start, end) in enumerate(timestamps[:5].tolist()):  # 只显示前5个
+                print(f"  片段 {i+1}: {start:.2f}s - {end:.2f}s "
+                      f"(持续 {end-start:.2f}s)")
             if len(timestamps) > 5:
                 print(f"  ... 以及其他 {len(timestamps)-5} 个片段")
             
@@ -160,7 +235,7 @@ class ASSGenerator:
         生成ASS字幕文件
         
         Args:
-            timestamps: 语音时间戳列表（秒）
+            timestamps: 形状为 (N, 2) 的语音时间戳数组（秒）
             
         Returns:
             bool: 是否成功
@@ -176,7 +251,7 @@ class ASSGenerator:
             output_ass = str(output_path / output_filename)
             
             # 更新config中的output_ass，以便后续打印正确的路径
-            self.config.output_ass = output_ass
+            self.config.set('paths.output_ass', output_ass)
             
             # 如果目录不存在，创建它
             output_path.mkdir(parents=True, exist_ok=True)
@@ -184,22 +259,14 @@ class ASSGenerator:
             print(f"检测到输出路径为目录，自动生成文件名: {output_filename}")
         
         try:
-            # 预处理时间戳，调整间隔过小的语音片段
-            processed_timestamps = pre_process(timestamps, config=self.config)
+            # 预处理时间戳，调整间隔过小的语音片段；
+            # 预处理和ASSWriter的时间格式转换都按数组批量进行
+            ass_timestamps = pre_process(timestamps, config=self.config)
             
             print(f"\n时间戳预处理配置:")
             print(f"  - 最小间隔: {self.config.merge_min_gap}秒")
             print(f"\n预处理结果:")
-            print(f"  - 片段数量: {len(processed_timestamps)} 个")
-            
-            # 转换时间格式
-            ass_timestamps = []
-            for ts in processed_timestamps:
-                ass_ts = {
-                    'start': seconds_to_ass_time(ts['start']),
-                    'end': seconds_to_ass_time(ts['end'])
-                }
-                ass_timestamps.append(ass_ts)
+            print(f"  - 片段数量: {len(ass_timestamps)} 个")
             
             # 写入ASS文件
             ASSWriter.write_ass_file(
@@ -265,6 +332,12 @@ def main():
         help='输出WAV音频文件路径（覆盖配置文件中的设置）'
     )
     
+    parser.add_argument(
+        '--strict-check',
+        action='store_true',
+        help='运行 ffmpeg -version 严格检查FFmpeg是否可用（默认只查找可执行文件）'
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -273,11 +346,13 @@ def main():
         
         # 命令行参数覆盖配置文件
         if args.input:
-            config._config['paths']['input_file'] = args.input
+            config.set('paths.input_file', args.input)
         if args.output:
-            config._config['paths']['output_ass'] = args.output
+            config.set('paths.output_ass', args.output)
         if args.wav:
-            config._config['paths']['output_wav'] = args.wav
+            config.set('paths.output_wav', args.wav)
+        if args.strict_check:
+            config.set('audio.strict_ffmpeg_check', True)
         
         # 创建生成器并执行
         generator = ASSGenerator(config)
@@ -3,14 +3,18 @@
 包含音频提取、时间转换和文件IO功能
 """
 from .audio_extractor import AudioExtractor
-from .time_converter import seconds_to_ass_time, ass_time_to_seconds, pre_process
+from .time_converter import (seconds_to_ass_time, seconds_to_ass_times, ass_time_to_seconds,
+                             pre_process, pre_process_array, merge_timestamp_lists)
 from .file_io import ConfigReader, ASSWriter
 
 __all__ = [
     'AudioExtractor',
     'seconds_to_ass_time',
+    'seconds_to_ass_times',
     'ass_time_to_seconds',
     'pre_process',
+    'pre_process_array',
+    'merge_timestamp_lists',
     'ConfigReader',
     'ASSWriter'
 ]
@@ -1,11 +1,43 @@
 """
 音频提取工具
-使用FFmpeg将视频/音频文件转换为16kHz采样率的wav文件
+使用FFmpeg将视频/音频文件转换为16kHz采样率的wav文件；
+安装了PyAV时也可以在进程内直接解码为NumPy数组
 """
+import asyncio
+import functools
+import importlib.util
+import shutil
 import subprocess
 import os
 from pathlib import Path
 
+import numpy as np
+
+# PyAV和soundfile只在进程内解码、保存wav时使用，这里只检查是否已安装，用到时再导入
+AV_AVAILABLE = importlib.util.find_spec('av') is not None
+SOUNDFILE_AVAILABLE = importlib.util.find_spec('soundfile') is not None
+
+# 输入没有音轨时FFmpeg的报错信息（-vn后没有可输出的流）
+_NO_STREAM_MESSAGE = 'does not contain any stream'
+
+
+@functools.lru_cache(maxsize=64)
+def _probe_audio_stream(input_path, mtime_ns):
+    """
+    用PyAV读取容器头部，判断文件中是否有音轨（不解码）
+    
+    Args:
+        input_path: 输入文件路径
+        mtime_ns: 文件修改时间，作为缓存键的一部分，文件被替换后重新检查
+        
+    Returns:
+        bool: 是否有音轨
+    """
+    import av
+    
+    with av.open(input_path) as container:
+        return bool(container.streams.audio)
+
 
 class AudioExtractor:
     """音频提取器，使用FFmpeg进行音频提取和转换"""
@@ -19,8 +51,10 @@ class AudioExtractor:
         """
         # 如果传入的是None或空字符串，使用默认值'ffmpeg'
         self.ffmpeg_path = ffmpeg_path if ffmpeg_path else 'ffmpeg'
+        # shutil.which 查找到的FFmpeg可执行文件路径，首次检查时计算
+        self._ffmpeg_resolved = None
         
-    def extract_audio(self, input_path, output_path, sample_rate=16000):
+    def extract_audio(self, input_path, output_path, sample_rate=16000, threads=None):
         """
         从视频/音频文件中提取音频并转换为指定采样率的wav文件
         
@@ -28,6 +62,8 @@ class AudioExtractor:
             input_path: 输入文件路径（视频或音频）
             output_path: 输出wav文件路径
             sample_rate: 采样率，默认16000Hz
+            threads: FFmpeg解码线程数，None表示由FFmpeg自动决定；
+                     并发运行多个FFmpeg进程时可限制线程数以避免争抢CPU
             
         Returns:
             bool: 是否成功提取
@@ -51,8 +87,11 @@ class AudioExtractor:
         # -ac: 设置声道数为1（单声道）
         # -y: 覆盖输出文件
         # -vn: 不处理视频
-        cmd = [
-            self.ffmpeg_path,
+        # -threads: 解码线程数（放在-i之前，作用于输入）
+        cmd = [self.ffmpeg_path]
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd += [
             '-i', input_path,
             '-ar', str(sample_rate),
             '-ac', '1',
@@ -80,18 +119,359 @@ class AudioExtractor:
                 raise RuntimeError("FFmpeg执行完成但未生成输出文件")
                 
         except subprocess.CalledProcessError as e:
+            if _NO_STREAM_MESSAGE in e.stderr:
+                raise RuntimeError(f"文件中没有音轨: {input_path}")
             error_msg = f"FFmpeg执行失败:\n{e.stderr}"
             raise RuntimeError(error_msg)
         except Exception as e:
             raise RuntimeError(f"音频提取过程中发生错误: {str(e)}")
     
-    def check_ffmpeg_available(self):
+    def extract_audio_array(self, input_path, sample_rate=16000, output_path=None):
+        """
+        在进程内解码视频/音频文件，直接得到指定采样率的单声道音频数组（需要PyAV）
+        
+        不启动FFmpeg子进程，也不经过磁盘上的WAV文件；
+        只有给出output_path时才另外保存为16位PCM的wav文件
+        
+        Args:
+            input_path: 输入文件路径（视频或音频）
+            sample_rate: 采样率，默认16000Hz
+            output_path: 可选的输出wav文件路径
+            
+        Returns:
+            np.ndarray: float32单声道音频，取值范围[-1, 1)，与soundfile读取提取出的wav相同
+            
+        Raises:
+            FileNotFoundError: 输入文件不存在
+            RuntimeError: PyAV不可用或解码失败
+        """
+        if not AV_AVAILABLE:
+            raise RuntimeError("进程内解码需要PyAV，请安装: pip install av")
+        
+        # 检查输入文件是否存在
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"输入文件不存在: {input_path}")
+        
+        try:
+            pcm = self._decode_pcm16(input_path, sample_rate)
+        except Exception as e:
+            raise RuntimeError(f"音频解码过程中发生错误: {str(e)}")
+        
+        if output_path:
+            self._write_wav(output_path, pcm, sample_rate)
+        
+        return self._pcm16_to_float32(pcm)
+    
+    def extract_audio_pcm(self, input_path, sample_rate=16000, output_path=None, threads=None):
+        """
+        用FFmpeg解码视频/音频文件，通过管道直接读取单声道16位PCM，不经过磁盘上的wav文件
+        
+        只有给出output_path时才另外保存为16位PCM的wav文件
+        
+        Args:
+            input_path: 输入文件路径（视频或音频）
+            sample_rate: 采样率，默认16000Hz
+            output_path: 可选的输出wav文件路径
+            threads: FFmpeg解码线程数，None表示由FFmpeg自动决定
+            
+        Returns:
+            np.ndarray: float32单声道音频，取值范围[-1, 1)，与soundfile读取extract_audio生成的wav相同
+            
+        Raises:
+            FileNotFoundError: 输入文件不存在
+            RuntimeError: FFmpeg执行失败
+        """
+        # 检查输入文件是否存在
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"输入文件不存在: {input_path}")
+        
+        # -f s16le: 输出无文件头的16位小端PCM，写到标准输出（-）
+        cmd = [self.ffmpeg_path, '-nostdin', '-loglevel', 'error']
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd += [
+            '-i', input_path,
+            '-vn',
+            '-ac', '1',
+            '-ar', str(sample_rate),
+            '-f', 's16le',
+            '-'
+        ]
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode('utf-8', errors='replace')
+            if _NO_STREAM_MESSAGE in stderr:
+                raise RuntimeError(f"文件中没有音轨: {input_path}")
+            error_msg = f"FFmpeg执行失败:\n{stderr}"
+            raise RuntimeError(error_msg)
+        except Exception as e:
+            raise RuntimeError(f"音频提取过程中发生错误: {str(e)}")
+        
+        pcm = np.frombuffer(result.stdout, dtype='<i2')
+        
+        if output_path:
+            self._write_wav(output_path, pcm, sample_rate)
+        
+        return self._pcm16_to_float32(pcm)
+    
+    @staticmethod
+    def _pcm16_to_float32(pcm):
+        """
+        将16位PCM转换为取值范围[-1, 1)的float32音频
+        
+        类型转换和缩放在一次乘法中完成，不产生中间数组；
+        1/32768是2的整数次幂，结果与先转float32再除以32768完全相同
+        
+        Args:
+            pcm: int16音频数组
+            
+        Returns:
+            np.ndarray: float32音频
+        """
+        return np.multiply(pcm, np.float32(1 / 32768), dtype=np.float32)
+    
+    @staticmethod
+    def _write_wav(output_path, pcm, sample_rate):
+        """
+        将16位PCM保存为wav文件（需要soundfile）
+        
+        Args:
+            output_path: 输出wav文件路径
+            pcm: int16单声道音频
+            sample_rate: 采样率
+        """
+        if not SOUNDFILE_AVAILABLE:
+            raise RuntimeError("保存wav文件需要soundfile，请安装: pip install soundfile")
+        import soundfile
+        
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+        soundfile.write(output_path, pcm, sample_rate, subtype='PCM_16')
+        print(f"音频提取成功: {output_path}")
+    
+    @staticmethod
+    def _decode_pcm16(input_path, sample_rate):
+        """
+        用PyAV解码第一条音轨，重采样为单声道16位PCM
+        
+        Args:
+            input_path: 输入文件路径
+            sample_rate: 采样率
+            
+        Returns:
+            np.ndarray: int16单声道音频
+        """
+        import av
+        
+        with av.open(input_path) as container:
+            if not container.streams.audio:
+                raise RuntimeError(f"文件中没有音轨: {input_path}")
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format='s16', layout='mono', rate=sample_rate)
+            
+            chunks = []
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            # 取出重采样器中剩余的样本
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        
+        if not chunks:
+            return np.empty(0, dtype=np.int16)
+        return np.concatenate(chunks)
+    
+    def extract_audio_batch(self, input_paths, output_paths, sample_rate=16000):
+        """
+        在一次FFmpeg调用中提取多个文件的音频
+        
+        多个输入共用一个FFmpeg进程，省去逐个启动进程和初始化的开销
+        
+        Args:
+            input_paths: 输入文件路径列表（视频或音频）
+            output_paths: 输出wav文件路径列表，与input_paths一一对应
+            sample_rate: 采样率，默认16000Hz
+            
+        Returns:
+            bool: 是否成功提取
+            
+        Raises:
+            ValueError: 输入和输出数量不一致
+            FileNotFoundError: 输入文件不存在
+            RuntimeError: FFmpeg执行失败
+        """
+        cmd = self._build_batch_command(input_paths, output_paths, sample_rate)
+        
+        try:
+            subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+            
+            missing = [p for p in output_paths if not os.path.exists(p)]
+            if missing:
+                raise RuntimeError(f"FFmpeg执行完成但未生成输出文件: {missing}")
+            
+            print(f"音频提取成功: {len(output_paths)} 个文件")
+            return True
+                
+        except subprocess.CalledProcessError as e:
+            error_msg = f"FFmpeg执行失败:\n{e.stderr}"
+            raise RuntimeError(error_msg)
+        except Exception as e:
+            raise RuntimeError(f"音频提取过程中发生错误: {str(e)}")
+    
+    def _build_batch_command(self, input_paths, output_paths, sample_rate):
+        """
+        检查批量提取的输入输出并构建FFmpeg命令
+        
+        Args:
+            input_paths: 输入文件路径列表
+            output_paths: 输出wav文件路径列表
+            sample_rate: 采样率
+            
+        Returns:
+            list: FFmpeg命令参数列表
+            
+        Raises:
+            ValueError: 输入和输出数量不一致
+            FileNotFoundError: 输入文件不存在
+        """
+        if len(input_paths) != len(output_paths):
+            raise ValueError("输入文件和输出文件数量不一致")
+        
+        for input_path in input_paths:
+            if not os.path.exists(input_path):
+                raise FileNotFoundError(f"输入文件不存在: {input_path}")
+        
+        # 确保输出目录存在
+        for output_path in output_paths:
+            output_dir = os.path.dirname(output_path)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+        
+        # 构建FFmpeg命令
+        # 所有输入在前，每个输出通过 -map i:a:0 选取第i个输入的第一条音轨
+        cmd = [self.ffmpeg_path, '-nostdin', '-y']
+        for input_path in input_paths:
+            cmd += ['-i', input_path]
+        for i, output_path in enumerate(output_paths):
+            cmd += [
+                '-map', f'{i}:a:0',
+                '-ar', str(sample_rate),
+                '-ac', '1',
+                output_path
+            ]
+        
+        return cmd
+    
+    async def extract_audio_batch_async(self, input_paths, output_paths, sample_rate=16000):
+        """
+        extract_audio_batch 的异步版本，使用 asyncio 子进程运行FFmpeg
+        
+        等待FFmpeg时不占用线程，可以在一个事件循环中同时运行多个FFmpeg进程
+        
+        Args:
+            input_paths: 输入文件路径列表（视频或音频）
+            output_paths: 输出wav文件路径列表，与input_paths一一对应
+            sample_rate: 采样率，默认16000Hz
+            
+        Returns:
+            bool: 是否成功提取
+            
+        Raises:
+            ValueError: 输入和输出数量不一致
+            FileNotFoundError: 输入文件不存在
+            RuntimeError: FFmpeg执行失败
+        """
+        cmd = self._build_batch_command(input_paths, output_paths, sample_rate)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+        except Exception as e:
+            raise RuntimeError(f"音频提取过程中发生错误: {str(e)}")
+        
+        if process.returncode != 0:
+            error_msg = f"FFmpeg执行失败:\n{stderr.decode('utf-8', errors='replace')}"
+            raise RuntimeError(error_msg)
+        
+        missing = [p for p in output_paths if not os.path.exists(p)]
+        if missing:
+            raise RuntimeError(f"FFmpeg执行完成但未生成输出文件: {missing}")
+        
+        print(f"音频提取成功: {len(output_paths)} 个文件")
+        return True
+    
+    @staticmethod
+    def check_av_available():
+        """
+        检查能否在进程内解码（PyAV是否已安装）
+        
+        Returns:
+            bool: PyAV是否可用
+        """
+        return AV_AVAILABLE
+    
+    @staticmethod
+    def has_audio_stream(input_path):
+        """
+        检查文件中是否有音轨
+        
+        只用PyAV读取容器头部，不解码，结果按文件路径和修改时间缓存；
+        不另外启动ffprobe——没有音轨时FFmpeg本身也会在读取头部后立即报错
+        
+        Args:
+            input_path: 输入文件路径
+            
+        Returns:
+            bool | None: 是否有音轨；PyAV不可用或无法读取文件时为None（未知）
+        """
+        if not AV_AVAILABLE:
+            return None
+        try:
+            return _probe_audio_stream(os.path.abspath(input_path),
+                                       os.stat(input_path).st_mtime_ns)
+        except Exception:
+            return None
+    
+    def check_ffmpeg_available(self, strict=False):
         """
         检查FFmpeg是否可用
         
+        默认只用 shutil.which 检查可执行文件是否存在（结果按实例缓存），不启动子进程；
+        strict=True 时另外运行一次 ffmpeg -version 确认其能正常执行
+        
+        Args:
+            strict: 是否运行 ffmpeg -version 进行严格检查
+            
         Returns:
             bool: FFmpeg是否可用
         """
+        if self._ffmpeg_resolved is None:
+            # 命令名按PATH查找，带目录的路径直接检查该文件是否可执行
+            self._ffmpeg_resolved = shutil.which(self.ffmpeg_path) or ''
+        if not self._ffmpeg_resolved:
+            return False
+        if not strict:
+            return True
+        
         try:
             result = subprocess.run(
                 [self.ffmpeg_path, '-version'],
@@ -2,11 +2,29 @@
 文件IO工具
 处理配置文件读取和ASS文件写入
 """
+import copy
 import json
-import yaml
 import os
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def _yaml():
+    """
+    按需导入PyYAML（只有读写YAML配置时才需要）
+    
+    Returns:
+        tuple: (yaml模块, Loader, Dumper)；PyYAML带有libyaml时使用其C实现，比纯Python的解析器快数倍
+    """
+    import yaml
+    if getattr(yaml, '__with_libyaml__', False):
+        return yaml, yaml.CSafeLoader, yaml.CSafeDumper
+    return yaml, yaml.SafeLoader, yaml.SafeDumper
+
 
 class ConfigReader:
     """配置文件读取器，支持JSON和YAML格式"""
@@ -29,14 +47,24 @@ class ConfigReader:
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"配置文件不存在: {config_path}")
         
+        # 按路径和修改时间缓存解析结果，文件修改后自动重新读取；
+        # 返回副本，调用方修改配置不会影响缓存
+        return copy.deepcopy(ConfigReader._read_config_cached(
+            os.path.abspath(config_path), os.path.getmtime(config_path)))
+    
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _read_config_cached(config_path, mtime):
+        """解析配置文件（结果由lru_cache按路径和修改时间缓存）"""
         file_ext = os.path.splitext(config_path)[1].lower()
         
         if file_ext == '.json':
             with open(config_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         elif file_ext in ['.yaml', '.yml']:
+            yaml, loader, _ = _yaml()
             with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=loader)
         else:
             raise ValueError(f"不支持的配置文件格式: {file_ext}")
     
@@ -58,8 +86,10 @@ class ConfigReader:
             with open(config_path, 'w', encoding='utf-8') as f:
                 json.dump(config_dict, f, ensure_ascii=False, indent=2)
         elif file_ext in ['.yaml', '.yml']:
+            yaml, _, dumper = _yaml()
             with open(config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(config_dict, f, allow_unicode=True, default_flow_style=False)
+                yaml.dump(config_dict, f, Dumper=dumper,
+                          allow_unicode=True, default_flow_style=False)
         else:
             raise ValueError(f"不支持的配置文件格式: {file_ext}")
 
@@ -67,6 +97,63 @@ class ConfigReader:
 class ASSWriter:
     """ASS字幕文件写入器"""
     
+    # [V4+ Styles] 的字段：既是Format行中的字段名，也是Style行按顺序取值的style_config键
+    STYLE_FIELDS = (
+        'Name', 'Fontname', 'Fontsize', 'PrimaryColour', 'SecondaryColour',
+        'OutlineColour', 'BackColour', 'Bold', 'Italic', 'Underline', 'StrikeOut',
+        'ScaleX', 'ScaleY', 'Spacing', 'Angle', 'BorderStyle', 'Outline', 'Shadow',
+        'Alignment', 'MarginL', 'MarginR', 'MarginV', 'Encoding'
+    )
+    
+    # 未指定style_config时使用的默认样式
+    DEFAULT_STYLE = {
+        'Name': 'Default',
+        'Fontname': 'Microsoft YaHei',
+        'Fontsize': 48,
+        'PrimaryColour': '&H00FFFFFF',  # 白色
+        'SecondaryColour': '&H000000FF',  # 红色
+        'OutlineColour': '&H00000000',  # 黑色边框
+        'BackColour': '&H80000000',  # 半透明黑色背景
+        'Bold': 0,
+        'Italic': 0,
+        'Underline': 0,
+        'StrikeOut': 0,
+        'ScaleX': 100,
+        'ScaleY': 100,
+        'Spacing': 0,
+        'Angle': 0,
+        'BorderStyle': 1,
+        'Outline': 2,
+        'Shadow': 3,
+        'Alignment': 2,  # 底部居中
+        'MarginL': 10,
+        'MarginR': 10,
+        'MarginV': 25,
+        'Encoding': 1
+    }
+    
+    # 文件中不随字幕内容变化的部分，只在类定义时拼接一次
+    _SCRIPT_INFO_TEMPLATE = "\n".join([
+        "[Script Info]",
+        "; 由 auto-ass-gen 自动生成",
+        "Title: {title}",
+        "ScriptType: v4.00+",
+        "PlayResX: {width}",
+        "PlayResY: {height}",
+        "Timer: 100.0000",
+        "",
+    ])
+    _STYLE_TEMPLATE = "\n".join([
+        "[V4+ Styles]",
+        "Format: " + ", ".join(STYLE_FIELDS),
+        "Style: " + ",".join("{%s}" % key for key in STYLE_FIELDS),
+        "",
+    ])
+    _EVENTS_HEADER = "\n".join([
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ])
+    
     @staticmethod
     def write_ass_file(output_path, timestamps, title="自动生成字幕", 
                        resolution=(1280, 720), style_config=None):
@@ -75,7 +162,8 @@ class ASSWriter:
         
         Args:
             output_path: 输出ASS文件路径
-            timestamps: 时间戳列表，格式为 [{'start': 'H:MM:SS.ss', 'end': 'H:MM:SS.ss'}, ...]
+            timestamps: 时间戳列表，格式为 [{'start': 'H:MM:SS.ss', 'end': 'H:MM:SS.ss'}, ...]，
+                也可以是形状为 (N, 2) 的数组，每行为以秒为单位的 [start, end]
             title: 字幕标题
             resolution: 视频分辨率 (宽, 高)
             style_config: 样式配置字典，如果为None则使用默认样式
@@ -85,74 +173,31 @@ class ASSWriter:
         
         # 默认样式配置
         if style_config is None:
-            style_config = {
-                'Name': 'Default',
-                'Fontname': 'Microsoft YaHei',
-                'Fontsize': 48,
-                'PrimaryColour': '&H00FFFFFF',  # 白色
-                'SecondaryColour': '&H000000FF',  # 红色
-                'OutlineColour': '&H00000000',  # 黑色边框
-                'BackColour': '&H80000000',  # 半透明黑色背景
-                'Bold': 0,
-                'Italic': 0,
-                'Underline': 0,
-                'StrikeOut': 0,
-                'ScaleX': 100,
-                'ScaleY': 100,
-                'Spacing': 0,
-                'Angle': 0,
-                'BorderStyle': 1,
-                'Outline': 2,
-                'Shadow': 3,
-                'Alignment': 2,  # 底部居中
-                'MarginL': 10,
-                'MarginR': 10,
-                'MarginV': 25,
-                'Encoding': 1
-            }
+            style_config = ASSWriter.DEFAULT_STYLE
+        
+        if isinstance(timestamps, np.ndarray):
+            # 秒数数组：批量转换为ASS时间格式
+            from .time_converter import seconds_to_ass_times
+            ass_times = seconds_to_ass_times(timestamps.reshape(-1, 2))
+            starts, ends = ass_times[0::2], ass_times[1::2]
+        else:
+            starts = list(map(itemgetter('start'), timestamps))
+            ends = list(map(itemgetter('end'), timestamps))
+        
+        # 所有行先拼接为一个字符串，再一次性写入文件
+        parts = [
+            ASSWriter._SCRIPT_INFO_TEMPLATE.format(title=title, width=resolution[0],
+                                                   height=resolution[1]),
+            ASSWriter._STYLE_TEMPLATE.format_map(style_config),
+            ASSWriter._EVENTS_HEADER,
+        ]
+        # Dialogue: Layer, Start, End, Style, Actor, MarginL, MarginR, MarginV, Effect, Text
+        parts.extend(f"Dialogue: 0,{start},{end},Default,,0,0,0,,Test SubTitle {i}"
+                     for i, (start, end) in enumerate(zip(starts, ends)))
+        parts.append("")
         
         with open(output_path, 'w', encoding='utf-8-sig') as f:
-            # 写入脚本信息
-            f.write("[Script Info]\n")
-            f.write("; 由 auto-ass-gen 自动生成\n")
-            f.write(f"Title: {title}\n")
-            f.write("ScriptType: v4.00+\n")
-            f.write(f"PlayResX: {resolution[0]}\n")
-            f.write(f"PlayResY: {resolution[1]}\n")
-            f.write("Timer: 100.0000\n")
-            f.write("\n")
-            
-            # 写入样式定义
-            f.write("[V4+ Styles]\n")
-            f.write("Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
-                   "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
-                   "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
-                   "Alignment, MarginL, MarginR, MarginV, Encoding\n")
-            
-            style_line = (f"Style: {style_config['Name']},{style_config['Fontname']},"
-                         f"{style_config['Fontsize']},{style_config['PrimaryColour']},"
-                         f"{style_config['SecondaryColour']},{style_config['OutlineColour']},"
-                         f"{style_config['BackColour']},{style_config['Bold']},"
-                         f"{style_config['Italic']},{style_config['Underline']},"
-                         f"{style_config['StrikeOut']},{style_config['ScaleX']},"
-                         f"{style_config['ScaleY']},{style_config['Spacing']},"
-                         f"{style_config['Angle']},{style_config['BorderStyle']},"
-                         f"{style_config['Outline']},{style_config['Shadow']},"
-                         f"{style_config['Alignment']},{style_config['MarginL']},"
-                         f"{style_config['MarginR']},{style_config['MarginV']},"
-                         f"{style_config['Encoding']}\n")
-            f.write(style_line)
-            f.write("\n")
-            
-            # 写入事件（字幕）
-            f.write("[Events]\n")
-            f.write("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
-            
-            for i, ts in enumerate(timestamps):
-                # Dialogue: Layer, Start, End, Style, Actor, MarginL, MarginR, MarginV, Effect, Text
-                dialogue_line = (f"Dialogue: 0,{ts['start']},{ts['end']},Default,,"
-                               f"0,0,0,,Test SubTitle {i}\n")
-                f.write(dialogue_line)
+            f.write("\n".join(parts))
         
         print(f"ASS字幕文件已生成: {output_path}")
 
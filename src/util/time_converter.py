@@ -2,6 +2,40 @@
 时间格式转换工具
 将秒转换为ASS字幕格式的时间字符串
 """
+import heapq
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
+
+# 从时间戳字典中取开始/结束时间（比lambda快，用于排序键和批量提取）
+_get_start = itemgetter('start')
+_get_end = itemgetter('end')
+
+# 0-99的两位补零字符串，格式化时按下标取用，不必每次解析 :02d 格式说明
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
+
+@lru_cache(maxsize=1 << 17)
+def _format_centiseconds(centiseconds):
+    """
+    将整数百分之一秒格式化为ASS时间格式: H:MM:SS.ss
+    
+    结果按整数缓存，字幕中重复出现的时间点（如相连片段的首尾）只需格式化一次；
+    缓存大小足以覆盖约21分钟内的所有时间点，超出后按LRU淘汰
+    
+    Args:
+        centiseconds: 百分之一秒数（int）
+        
+    Returns:
+        str: ASS格式的时间字符串
+    """
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    
+    # 格式化为 H:MM:SS.ss
+    return f"{hours}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[secs]}.{_TWO_DIGITS[centiseconds]}"
 
 
 def seconds_to_ass_time(seconds):
@@ -22,20 +56,43 @@ def seconds_to_ass_time(seconds):
         >>> seconds_to_ass_time(3661.25)
         '1:01:01.25'
     """
-    # 计算小时、分钟、秒和百分之一秒
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    centiseconds = int((seconds % 1) * 100)
+    # 先换算为整数百分之一秒，再用整数divmod拆分，避免浮点取模误差
+    # （例如 2.3 % 1 * 100 = 29.999...，直接截断会得到 .29）；
+    # 舍入到同一百分之一秒的不同浮点数共用同一个缓存项
+    return _format_centiseconds(int(round(seconds * 100)))
+
+
+def seconds_to_ass_times(seconds):
+    """
+    批量将秒转换为ASS时间格式，结果与逐个调用 seconds_to_ass_time 相同
     
-    # 格式化为 H:MM:SS.ss
-    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+    所有时间一次性换算为整数百分之一秒，并用向量化的divmod拆分时、分、秒，
+    只有最终的字符串格式化按元素进行
+    
+    Args:
+        seconds: 秒数数组（任意形状）
+        
+    Returns:
+        list: ASS格式的时间字符串列表（按展平顺序）
+    """
+    centiseconds = np.round(np.asarray(seconds, dtype=np.float64).ravel() * 100).astype(np.int64)
+    hours, centiseconds = np.divmod(centiseconds, 360000)
+    minutes, centiseconds = np.divmod(centiseconds, 6000)
+    secs, centiseconds = np.divmod(centiseconds, 100)
+    
+    two = _TWO_DIGITS
+    return [f"{h}:{two[m]}:{two[s]}.{two[cs]}"
+            for h, m, s, cs in zip(hours.tolist(), minutes.tolist(),
+                                   secs.tolist(), centiseconds.tolist())]
 
 
+@lru_cache(maxsize=65536)
 def ass_time_to_seconds(time_str):
     """
     将ASS时间格式转换为秒
     
+    结果按输入字符串缓存，重复出现的时间只需解析一次
+    
     Args:
         time_str: ASS格式的时间字符串，例如 "0:02:30.50"
         
@@ -50,18 +107,13 @@ def ass_time_to_seconds(time_str):
         >>> ass_time_to_seconds("1:01:01.25")
         3661.25
     """
-    # 分割时间字符串
-    time_parts = time_str.split(':')
-    hours = int(time_parts[0])
-    minutes = int(time_parts[1])
-    
-    # 处理秒和百分之一秒
-    sec_parts = time_parts[2].split('.')
-    seconds = int(sec_parts[0])
-    centiseconds = int(sec_parts[1]) if len(sec_parts) > 1 else 0
+    # 一次split取出时、分，再用partition分出秒和百分之一秒（可省略）
+    hours, minutes, rest = time_str.split(':')
+    seconds, _, centiseconds = rest.partition('.')
     
     # 转换为总秒数
-    total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100.0
+    total_seconds = (int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+                     + (int(centiseconds) if centiseconds else 0) / 100.0)
     return total_seconds
 
 
@@ -70,18 +122,17 @@ def pre_process(timestamps, config=None):
     预处理时间戳，调整间隔过小的语音片段
     
     Args:
-        timestamps: 原始时间戳列表，格式为 [{'start': float, 'end': float}, ...]
+        timestamps: 原始时间戳列表，格式为 [{'start': float, 'end': float}, ...]，
+                    也可以是形状为 (N, 2) 的 [start, end] 数组；
+                    已按开始时间排序时（如VAD的输出）会跳过排序
         config: 配置对象，包含参数配置。如果为None，使用默认值
         
     Returns:
-        list: 调整后的时间戳列表
+        list 或 np.ndarray: 调整后的时间戳，输入为数组时返回 (N, 2) 数组（见 pre_process_array）
         
     配置参数说明（通过config对象读取）：
         - merge_min_gap: 最小间隔（秒），小于此值时调整时间戳使其相连，默认0.5秒
     """
-    if not timestamps:
-        return []
-    
     # 从配置对象读取参数，如果没有配置则使用默认值
     if config is not None:
         min_gap = getattr(config, 'merge_min_gap', 0.5)
@@ -89,29 +140,99 @@ def pre_process(timestamps, config=None):
         # 默认值
         min_gap = 0.5
     
-    # 按开始时间排序（确保顺序正确）
-    sorted_timestamps = sorted(timestamps, key=lambda x: x['start'])
+    # 数组输入直接使用向量化实现，不构造字典
+    if isinstance(timestamps, np.ndarray):
+        return pre_process_array(timestamps, merge_min_gap=min_gap)
+    
+    # 单次遍历完成有序检查、复制和间隔调整，每个输出片段只分配一次；
+    # VAD的输出本来就是有序的，只有遇到乱序输入时才排序后重新遍历
+    processed = _adjust_min_gap(timestamps, min_gap)
+    if processed is None:
+        processed = _adjust_min_gap(sorted(timestamps, key=_get_start), min_gap)
+    
+    return processed
+
+
+def _adjust_min_gap(timestamps, min_gap):
+    """
+    按顺序遍历时间戳，间隔过小（且为正）时将前一个片段的结束时间调整为当前片段的开始时间
     
+    Args:
+        timestamps: 时间戳字典列表
+        min_gap: 最小间隔（秒）
+        
+    Returns:
+        list 或 None: 调整后的时间戳副本；输入未按开始时间排序时返回None
+    """
     processed = []
-    current = sorted_timestamps[0].copy()
+    append = processed.append
+    previous = None
+    previous_start = float('-inf')
     
-    for i in range(1, len(sorted_timestamps)):
-        next_ts = sorted_timestamps[i]
+    for ts in timestamps:
+        current = ts.copy()
+        start = current['start']
+        if start < previous_start:
+            return None
+        
+        if previous is not None:
+            gap = start - previous['end']
+            if 0 < gap < min_gap:
+                previous['end'] = start
         
-        # 计算与下一个片段的间隔
-        gap = next_ts['start'] - current['end']
+        append(current)
+        previous = current
+        previous_start = start
+    
+    return processed
+
+
+def merge_timestamp_lists(*timestamp_lists):
+    """
+    合并多个已按开始时间排序的时间戳列表（如多个声道分别做VAD的结果）
+    
+    用堆做K路归并，比先拼接再整体排序少一次拼接和大部分比较；
+    开始时间相同的片段保持参数中的先后顺序，结果与 sorted(a + b + ..., key=start) 相同
+    
+    Args:
+        *timestamp_lists: 各自已按开始时间排序的时间戳列表，格式为 [{'start': float, 'end': float}, ...]
         
-        # 检查间隔是否过小
-        if gap < min_gap and gap > 0:
-            # 间隔过小，调整当前片段的结束时间使其与下一个片段相连
-            current['end'] = next_ts['start']
+    Returns:
+        list: 按开始时间排序的合并结果（元素与输入共用，不复制）
+    """
+    return list(heapq.merge(*timestamp_lists, key=_get_start))
+
+
+def pre_process_array(intervals, merge_min_gap=0.5):
+    """
+    预处理时间戳的数组版本，规则与 pre_process 相同
+    
+    每个片段是否延长只取决于它自身的结束时间和下一个片段的开始时间，
+    相邻片段之间没有依赖，因此可以一次性向量化计算
+    
+    Args:
+        intervals: 形状为 (N, 2) 的数组，每行为 [start, end]
+        merge_min_gap: 最小间隔（秒），小于此值时调整时间戳使其相连
         
-        # 保存当前片段，开始新片段
-        processed.append(current)
-        current = next_ts.copy()
+    Returns:
+        np.ndarray: 按开始时间排序并调整后的 (N, 2) 数组（新数组，不修改输入）
+    """
+    intervals = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
     
-    # 添加最后一个片段
-    processed.append(current)
+    # 按开始时间排序（稳定排序，与 pre_process 中的 sorted 一致）；
+    # VAD的输出本来就按开始时间排列，此时无需排序，只复制一份
+    if (intervals[1:, 0] >= intervals[:-1, 0]).all():
+        processed = intervals.copy()
+    else:
+        processed = intervals[np.argsort(intervals[:, 0], kind='stable')]
+    
+    starts = processed[1:, 0]
+    ends = processed[:-1, 1]
+    gaps = starts - ends
+    
+    # 间隔过小（且为正）时，将当前片段的结束时间调整为下一个片段的开始时间
+    adjust = (gaps < merge_min_gap) & (gaps > 0)
+    ends[adjust] = starts[adjust]
     
     return processed
 
@@ -174,7 +295,7 @@ if __name__ == '__main__':
     
     assert processed_1[0]['end'] == 2.3, f"测试1失败：第一个片段应该延长到2.3，实际为{processed_1[0]['end']}"
     assert processed_1[1]['start'] == 2.3, "测试1失败：第二个片段应该从2.3开始"
-    assert processed_1[2]['end'] == 7.0, "测试1失败：第三个片段不应该调整"
+    assert processed_1[2]['end'] == 7.2, f"测试1失败：第三个片段应该延长到7.2，实际为{processed_1[2]['end']}"
     assert processed_1[2]['start'] == 5.0, "测试1失败：第三个片段应该从5.0开始"
     assert processed_1[3]['end'] == 9.0, "测试1失败：第四个片段结束时间不应该变"
     print("✓ 测试1通过")
@@ -205,6 +326,15 @@ if __name__ == '__main__':
     assert processed_3[0]['end'] == 2.0, "测试3失败：间隔为0时不应该调整"
     print("✓ 测试3通过")
     
+    # 测试4：数组版本与字典版本结果一致
+    print("\n【测试4：pre_process_array 与 pre_process 结果一致】")
+    for timestamps in (test_timestamps_1, test_timestamps_2, test_timestamps_3):
+        expected = [[ts['start'], ts['end']] for ts in pre_process(timestamps, config=None)]
+        actual = pre_process_array([[ts['start'], ts['end']] for ts in timestamps], 0.5)
+        assert actual.tolist() == expected, "测试4失败：数组版本结果与字典版本不一致"
+    assert pre_process_array([], 0.5).shape == (0, 2), "测试4失败：空输入应返回空数组"
+    print("✓ 测试4通过")
+    
     print("\n✓ 所有时间戳预处理测试通过！")
     print("\n" + "=" * 60)
     print("所有测试通过！")
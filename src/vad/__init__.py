@@ -1,7 +1,13 @@
 """
 语音活动检测模块
 """
-from .vad_processor import VADProcessor
+from .vad_processor import (VADProcessor, probs_to_timestamps, timestamps_to_array,
+                            quantize_speech_probs, dequantize_speech_probs, threshold_on_prob_grid,
+                            create_onnx_session, convert_to_ort, ort_model_path,
+                            INT8_MODEL_PATH, EXECUTION_PROVIDERS)
 
-__all__ = ['VADProcessor']
+__all__ = ['VADProcessor', 'probs_to_timestamps', 'timestamps_to_array',
+           'quantize_speech_probs', 'dequantize_speech_probs', 'threshold_on_prob_grid',
+           'create_onnx_session', 'convert_to_ort', 'ort_model_path',
+           'INT8_MODEL_PATH', 'EXECUTION_PROVIDERS']
 
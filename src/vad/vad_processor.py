@@ -2,9 +2,12 @@
 语音活动检测模块
 基于Silero VAD实现语音检测功能
 """
+import math
 import torch
 import torchaudio
 import warnings
+import numpy as np
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -17,6 +20,63 @@ except ImportError:
     )
     SILERO_AVAILABLE = False
 
+try:
+    from importlib.metadata import version as _package_version
+    SILERO_VERSION = _package_version('silero-vad')
+except Exception:
+    SILERO_VERSION = 'unknown'
+
+# silero-vad 6.x 自带的v6模型（单一state张量，LSTM已融合）比5.x的模型更快
+RECOMMENDED_SILERO_MAJOR = 6
+
+try:
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    # 可选：比torchaudio的Resample更快的重采样（C实现）
+    import soxr
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
+try:
+    # 用于加载自定义的ONNX模型文件（如量化后的模型）
+    from silero_vad.utils_vad import OnnxWrapper
+except ImportError:
+    OnnxWrapper = None
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+try:
+    # silero-vad 6.x 起提供基于概率生成时间戳的接口
+    from silero_vad.utils_vad import get_speech_timestamps_from_probs
+except ImportError:
+    get_speech_timestamps_from_probs = None
+
+
+@lru_cache(maxsize=16)
+def _get_resampler(orig_freq: int, new_freq: int) -> 'torchaudio.transforms.Resample':
+    """
+    获取重采样变换（按采样率对缓存）
+    
+    创建Resample时要预先计算滤波器核，输入文件通常只有少数几种采样率，
+    每种只需计算一次
+    
+    Args:
+        orig_freq: 原采样率
+        new_freq: 目标采样率
+        
+    Returns:
+        torchaudio.transforms.Resample: 重采样变换
+    """
+    return torchaudio.transforms.Resample(orig_freq=orig_freq, new_freq=new_freq)
+
 
 def read_audio(path: str, sampling_rate: int = 16000) -> torch.Tensor:
     """
@@ -30,76 +90,426 @@ def read_audio(path: str, sampling_rate: int = 16000) -> torch.Tensor:
     Returns:
         torch.Tensor: 单声道音频张量
     """
-    # 尝试不同的后端加载音频
-    # torchaudio 2.x 的 load() 函数不再接受 backend 参数
-    # 需要使用 torchaudio.backend 来设置
-    
-    backends_to_try = []
-    
-    # 检查可用的后端
-    try:
-        import soundfile
-        backends_to_try.append('soundfile')
-    except ImportError:
-        pass
-    
-    # 添加其他可能的后端
-    backends_to_try.extend(['sox', 'sox_io'])
-    
-    # 尝试加载音频
     wav = None
-    sr = None
-    last_error = None
+    soundfile_error = None
     
-    for backend_name in backends_to_try:
+    # 优先直接用soundfile解码
+    if SOUNDFILE_AVAILABLE:
         try:
-            # 设置后端
-            torchaudio.set_audio_backend(backend_name)
-            # 加载音频
-            wav, sr = torchaudio.load(path)
-            break
+            with soundfile.SoundFile(path) as f:
+                sr = f.samplerate
+                if f.channels == 1:
+                    wav = torch.from_numpy(f.read(dtype='float32'))
+                else:
+                    wav = _read_downmixed(f)
         except Exception as e:
-            last_error = e
-            continue
+            soundfile_error = e
     
-    # 如果所有后端都失败，尝试直接使用 soundfile
+    # soundfile不可用或不支持该格式时交给torchaudio
+    # （torchaudio 2.x 自行选择后端，不再需要 set_audio_backend）
     if wav is None:
         try:
-            import soundfile as sf
-            import numpy as np
-            
-            # 使用 soundfile 直接读取
-            data, sr = sf.read(path, dtype='float32')
-            
-            # 转换为 torch tensor
-            if len(data.shape) == 1:
-                # 单声道
-                wav = torch.from_numpy(data).unsqueeze(0)
-            else:
-                # 多声道，转置为 (channels, samples)
-                wav = torch.from_numpy(data.T)
-                
+            wav, sr = torchaudio.load(path)
         except Exception as e:
             raise RuntimeError(
                 f"无法读取音频文件: {path}\n"
-                f"最后的错误: {last_error}\n"
+                f"最后的错误: {soundfile_error or e}\n"
                 f"请确保已安装 soundfile: pip install soundfile"
             ) from e
+        # 转换为单声道
+        wav = wav.mean(dim=0)
     
-    # 转换为单声道
-    if wav.size(0) > 1:
-        wav = wav.mean(dim=0, keepdim=True)
-    
-    # 重采样到目标采样率
+    # 重采样到目标采样率（已经是目标采样率时直接返回，如FFmpeg提取的WAV）；
+    # 安装了soxr时用soxr，否则用torchaudio
     if sr != sampling_rate:
-        resampler = torchaudio.transforms.Resample(
-            orig_freq=sr,
-            new_freq=sampling_rate
+        if SOXR_AVAILABLE:
+            wav = torch.from_numpy(soxr.resample(wav.numpy(), sr, sampling_rate, quality='HQ'))
+        else:
+            wav = _get_resampler(sr, sampling_rate)(wav)
+    
+    return wav
+
+
+# 多声道音频混为单声道时每次读取的帧数
+_DOWNMIX_BLOCK_FRAMES = 1 << 16
+
+
+def _read_downmixed(sound_file) -> torch.Tensor:
+    """
+    逐块读取多声道音频并混为单声道
+    
+    不一次性读入全部声道的数据，峰值内存只有单声道结果加一个数据块
+    
+    Args:
+        sound_file: 已打开的 soundfile.SoundFile
+        
+    Returns:
+        torch.Tensor: float32单声道音频
+    """
+    mono = torch.empty(sound_file.frames, dtype=torch.float32)
+    pos = 0
+    for block in sound_file.blocks(blocksize=_DOWNMIX_BLOCK_FRAMES, dtype='float32', always_2d=True):
+        count = len(block)
+        torch.mean(torch.from_numpy(block.T), dim=0, out=mono[pos:pos + count])
+        pos += count
+    return mono[:pos]
+
+
+def get_window_size_samples(sampling_rate: int) -> int:
+    """
+    获取Silero VAD模型每次推理的窗口大小
+    
+    Args:
+        sampling_rate: 采样率，仅支持8000或16000Hz
+        
+    Returns:
+        int: 窗口样本数
+    """
+    if sampling_rate == 16000:
+        return 512
+    if sampling_rate == 8000:
+        return 256
+    raise ValueError(f"不支持的采样率: {sampling_rate}，仅支持8000或16000Hz")
+
+
+# 语音概率量化的分桶数：按0.01分桶，阈值为0.01整数倍时比较结果不变
+PROB_QUANT_LEVELS = 100
+
+
+def quantize_speech_probs(speech_probs):
+    """
+    将语音概率量化为uint8（按0.01向下分桶），内存占用为float32的1/4
+    
+    Args:
+        speech_probs: 语音概率数组
+        
+    Returns:
+        np.ndarray: 量化后的uint8数组，取值0-100
+    """
+    speech_probs = np.clip(np.asarray(speech_probs, dtype=np.float64), 0.0, 1.0)
+    return np.floor(speech_probs * PROB_QUANT_LEVELS).astype(np.uint8)
+
+
+def dequantize_speech_probs(quantized_probs):
+    """
+    将量化后的语音概率还原为每个分桶的中点
+    
+    取分桶中点时，与任意0.01整数倍阈值的比较结果和原始概率相同
+    
+    Args:
+        quantized_probs: quantize_speech_probs返回的uint8数组
+        
+    Returns:
+        np.ndarray: float32语音概率数组
+    """
+    return ((np.asarray(quantized_probs, dtype=np.float32) + 0.5) / PROB_QUANT_LEVELS).astype(np.float32)
+
+
+def threshold_on_prob_grid(threshold) -> bool:
+    """
+    阈值是否适用于量化后的语音概率
+    
+    阈值及后处理使用的 neg_threshold（max(threshold - 0.15, 0.01)）都落在量化刻度上时，
+    用量化概率得到的时间戳与原始概率完全相同
+    
+    Args:
+        threshold: 语音检测阈值
+        
+    Returns:
+        bool: 是否落在量化刻度上
+    """
+    for value in (threshold, max(threshold - 0.15, 0.01)):
+        scaled = value * PROB_QUANT_LEVELS
+        if abs(scaled - round(scaled)) >= 1e-6:
+            return False
+    return True
+
+
+def timestamps_to_array(speech_timestamps, dtype=np.float64) -> np.ndarray:
+    """
+    将时间戳字典列表一次性转换为 (N, 2) 数组
+    
+    Args:
+        speech_timestamps: 时间戳列表，格式为 [{'start': ..., 'end': ...}, ...]
+        dtype: 数组类型，秒数用float64（保持VAD四舍五入后的数值），样本数用int64
+        
+    Returns:
+        np.ndarray: 形状为 (N, 2) 的数组，每行为 [start, end]
+    """
+    return np.fromiter(
+        (value for ts in speech_timestamps for value in (ts['start'], ts['end'])),
+        dtype=dtype, count=2 * len(speech_timestamps)).reshape(-1, 2)
+
+
+def probs_to_timestamps(speech_probs, audio_length_samples, threshold=0.5,
+                        sampling_rate=16000, min_speech_duration_ms=250,
+                        max_speech_duration_s=float('inf'),
+                        min_silence_duration_ms=100, speech_pad_ms=30,
+                        return_seconds=True):
+    """
+    根据每个窗口的语音概率生成语音时间戳
+    
+    与silero_vad.get_speech_timestamps的后处理逻辑一致，但不运行模型，
+    因此可以对同一组概率反复尝试不同的阈值和时长参数。
+    已安装的silero-vad提供 get_speech_timestamps_from_probs 时直接使用它，
+    否则使用与silero-vad 5.x一致的实现
+    
+    Args:
+        speech_probs: 每个窗口的语音概率（get_speech_probs的返回值），
+            也可以是quantize_speech_probs量化后的uint8数组（此时阈值应为0.01的整数倍）
+        audio_length_samples: 音频样本数
+        threshold: 语音检测阈值
+        sampling_rate: 采样率
+        min_speech_duration_ms: 最小语音持续时间（毫秒）
+        max_speech_duration_s: 最大语音持续时间（秒）
+        min_silence_duration_ms: 最小静音持续时间（毫秒）
+        speech_pad_ms: 语音片段前后填充时间（毫秒）
+        return_seconds: 是否返回秒数（True）还是样本数（False）
+        
+    Returns:
+        list: 语音时间戳列表，格式同 VADProcessor.detect_speech
+    """
+    if np.asarray(speech_probs).dtype == np.uint8:
+        speech_probs = dequantize_speech_probs(speech_probs)
+    
+    if get_speech_timestamps_from_probs is not None:
+        return get_speech_timestamps_from_probs(
+            np.asarray(speech_probs).tolist(),
+            sampling_rate=sampling_rate,
+            threshold=threshold,
+            min_speech_duration_ms=min_speech_duration_ms,
+            max_speech_duration_s=max_speech_duration_s,
+            min_silence_duration_ms=min_silence_duration_ms,
+            speech_pad_ms=speech_pad_ms,
+            return_seconds=return_seconds,
+            audio_length_samples=audio_length_samples
         )
-        wav = resampler(wav)
     
-    # 返回一维张量
-    return wav.squeeze(0)
+    window_size_samples = get_window_size_samples(sampling_rate)
+    min_speech_samples = sampling_rate * min_speech_duration_ms / 1000
+    speech_pad_samples = sampling_rate * speech_pad_ms / 1000
+    max_speech_samples = (sampling_rate * max_speech_duration_s
+                          - window_size_samples - 2 * speech_pad_samples)
+    min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+    min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
+    neg_threshold = max(threshold - 0.15, 0.01)
+    
+    # 阈值比较一次性在NumPy中完成，循环中只处理状态转移
+    speech_probs = np.asarray(speech_probs)
+    is_speech = (speech_probs >= threshold).tolist()
+    is_silence = (speech_probs < neg_threshold).tolist()
+    
+    triggered = False
+    speeches = []
+    current_speech = {}
+    temp_end = 0
+    prev_end = next_start = 0
+    
+    for i in range(len(is_speech)):
+        sample = window_size_samples * i
+        
+        if is_speech[i] and temp_end:
+            temp_end = 0
+            if next_start < prev_end:
+                next_start = sample
+        
+        if is_speech[i] and not triggered:
+            triggered = True
+            current_speech['start'] = sample
+            continue
+        
+        if triggered and sample - current_speech['start'] > max_speech_samples:
+            if prev_end:
+                current_speech['end'] = prev_end
+                speeches.append(current_speech)
+                current_speech = {}
+                if next_start < prev_end:
+                    triggered = False
+                else:
+                    current_speech['start'] = next_start
+                prev_end = next_start = temp_end = 0
+            else:
+                current_speech['end'] = sample
+                speeches.append(current_speech)
+                current_speech = {}
+                prev_end = next_start = temp_end = 0
+                triggered = False
+                continue
+        
+        if is_silence[i] and triggered:
+            if not temp_end:
+                temp_end = sample
+            if sample - temp_end > min_silence_samples_at_max_speech:
+                prev_end = temp_end
+            if sample - temp_end < min_silence_samples:
+                continue
+            current_speech['end'] = temp_end
+            if current_speech['end'] - current_speech['start'] > min_speech_samples:
+                speeches.append(current_speech)
+            current_speech = {}
+            prev_end = next_start = temp_end = 0
+            triggered = False
+    
+    if current_speech and audio_length_samples - current_speech['start'] > min_speech_samples:
+        current_speech['end'] = audio_length_samples
+        speeches.append(current_speech)
+    
+    # 片段前后填充
+    for i, speech in enumerate(speeches):
+        if i == 0:
+            speech['start'] = int(max(0, speech['start'] - speech_pad_samples))
+        if i != len(speeches) - 1:
+            silence_duration = speeches[i + 1]['start'] - speech['end']
+            if silence_duration < 2 * speech_pad_samples:
+                speech['end'] += int(silence_duration // 2)
+                speeches[i + 1]['start'] = int(max(0, speeches[i + 1]['start'] - silence_duration // 2))
+            else:
+                speech['end'] = int(min(audio_length_samples, speech['end'] + speech_pad_samples))
+                speeches[i + 1]['start'] = int(max(0, speeches[i + 1]['start'] - speech_pad_samples))
+        else:
+            speech['end'] = int(min(audio_length_samples, speech['end'] + speech_pad_samples))
+    
+    if return_seconds:
+        audio_length_seconds = audio_length_samples / sampling_rate
+        for speech in speeches:
+            speech['start'] = max(round(speech['start'] / sampling_rate, 1), 0)
+            speech['end'] = min(round(speech['end'] / sampling_rate, 1), audio_length_seconds)
+    
+    return speeches
+
+
+# int8量化的Silero VAD模型的默认位置（需自行放置，输入输出须与已安装版本的模型一致）
+INT8_MODEL_PATH = Path(__file__).resolve().parent.parent.parent / 'models' / 'silero_vad.int8.onnx'
+
+
+def _major_version(version: str) -> int:
+    """取版本号的主版本，无法解析时视为最新版本"""
+    try:
+        return int(version.split('.')[0])
+    except ValueError:
+        return RECOMMENDED_SILERO_MAJOR
+
+
+def _bundled_onnx_model_path() -> str:
+    """silero-vad自带的ONNX模型文件路径（与load_silero_vad(onnx=True)使用的相同）"""
+    from importlib import resources
+    return str(resources.files('silero_vad.data').joinpath('silero_vad.onnx'))
+
+
+def ort_model_path(model_path) -> str:
+    """
+    ONNX模型对应的ORT格式模型路径
+    
+    同目录下同名的 .ort 文件存在且不比原模型旧时返回它，否则返回原路径。
+    ORT格式是ONNX Runtime自己的序列化格式，加载时省去protobuf解析和大部分图优化，
+    创建会话比加载 .onnx 快得多
+    
+    Args:
+        model_path: ONNX模型文件路径
+        
+    Returns:
+        str: 实际加载的模型文件路径
+    """
+    path = Path(model_path)
+    ort_path = path.with_suffix('.ort')
+    try:
+        if path.suffix != '.ort' and ort_path.stat().st_mtime >= path.stat().st_mtime:
+            return str(ort_path)
+    except OSError:
+        pass
+    return str(model_path)
+
+
+def convert_to_ort(model_path, output_path=None) -> str:
+    """
+    将ONNX模型转换为ORT格式，之后加载同名模型时自动使用
+    
+    只做与硬件无关的图优化（ORT_ENABLE_EXTENDED），转换结果只适用于CPU推理
+    
+    Args:
+        model_path: ONNX模型文件路径
+        output_path: 输出路径，默认为同目录下同名的 .ort 文件
+        
+    Returns:
+        str: ORT格式模型的路径
+    """
+    if onnxruntime is None:
+        raise ImportError("ONNX Runtime不可用，请安装: pip install onnxruntime")
+    output_path = str(output_path or Path(model_path).with_suffix('.ort'))
+    
+    opts = onnxruntime.SessionOptions()
+    opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    opts.optimized_model_filepath = output_path
+    opts.add_session_config_entry('session.save_model_format', 'ORT')
+    onnxruntime.InferenceSession(str(model_path), sess_options=opts,
+                                 providers=['CPUExecutionProvider'])
+    return output_path
+
+
+# 可选的ONNX Runtime执行提供程序及其参数；除CPU外都以CPU作为后备
+EXECUTION_PROVIDERS = {
+    'cpu': [],
+    'openvino': [('OpenVINOExecutionProvider', {'device_type': 'CPU_FP32'})],
+    'coreml': [('CoreMLExecutionProvider', {'MLComputeUnits': 'ALL'})],
+    'cuda': [('CUDAExecutionProvider', {})],
+    'dml': [('DmlExecutionProvider', {})],
+}
+
+
+def create_onnx_session(model_path, intra_op_threads=1, execution_provider='cpu'):
+    """
+    创建用于VAD推理的ONNX Runtime会话
+    
+    开启全部图优化（节点融合等），顺序执行。指定的执行提供程序不可用
+    （未安装对应的onnxruntime包）或创建会话失败时，打印警告并改用CPU
+    
+    CPU推理时，模型有对应的ORT格式文件（见 convert_to_ort）则加载该文件
+    
+    Args:
+        model_path: ONNX模型文件路径
+        intra_op_threads: 算子内线程数；Silero VAD每次只处理一个很小的窗口，线程多了反而更慢
+        execution_provider: 执行提供程序，cpu / openvino / coreml / cuda / dml
+        
+    Returns:
+        onnxruntime.InferenceSession: 推理会话
+        
+    Raises:
+        ValueError: 不支持的执行提供程序
+    """
+    if onnxruntime is None:
+        raise ImportError("ONNX Runtime不可用，请安装: pip install onnxruntime")
+    if execution_provider not in EXECUTION_PROVIDERS:
+        raise ValueError(f"不支持的执行提供程序: {execution_provider}，"
+                         f"可选值: {', '.join(EXECUTION_PROVIDERS)}")
+    
+    # ORT格式模型的预先优化只针对CPU，其他执行提供程序仍加载原模型
+    if execution_provider == 'cpu':
+        model_path = ort_model_path(model_path)
+    
+    opts = onnxruntime.SessionOptions()
+    opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    opts.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    opts.intra_op_num_threads = intra_op_threads or 1
+    opts.inter_op_num_threads = 1
+    opts.enable_cpu_mem_arena = True
+    cpu = [('CPUExecutionProvider', {})]
+    
+    providers = EXECUTION_PROVIDERS[execution_provider]
+    available = onnxruntime.get_available_providers()
+    missing = [name for name, _ in providers if name not in available]
+    if missing:
+        print(f"警告: 当前onnxruntime不支持 {', '.join(missing)}，使用CPU推理")
+    elif providers:
+        try:
+            return onnxruntime.InferenceSession(
+                str(model_path), sess_options=opts,
+                providers=[name for name, _ in providers + cpu],
+                provider_options=[options for _, options in providers + cpu])
+        except Exception as e:
+            print(f"警告: 使用 {execution_provider} 创建推理会话失败，使用CPU推理: {e}")
+    
+    return onnxruntime.InferenceSession(str(model_path), sess_options=opts,
+                                        providers=['CPUExecutionProvider'])
 
 
 class VADProcessor:
@@ -107,7 +517,8 @@ class VADProcessor:
     
     def __init__(self, use_onnx=True, threshold=0.5, min_speech_duration_ms=250,
                  max_speech_duration_s=float('inf'), min_silence_duration_ms=100,
-                 speech_pad_ms=30):
+                 speech_pad_ms=30, onnx_model_path=None, intra_op_threads=None,
+                 batch_size=1, execution_provider='cpu', device=None):
         """
         初始化VAD处理器
         
@@ -118,6 +529,16 @@ class VADProcessor:
             max_speech_duration_s: 最大语音持续时间（秒）
             min_silence_duration_ms: 最小静音持续时间（毫秒）
             speech_pad_ms: 语音片段前后填充时间（毫秒）
+            onnx_model_path: 自定义ONNX模型文件路径（如int8量化模型），为None时使用
+                             silero-vad自带的模型；模型的输入输出须与已安装版本的模型一致
+            intra_op_threads: ONNX Runtime算子内线程数，为None时使用silero-vad的默认设置（单线程）
+            batch_size: 大于1时把长音频切成若干段作为同一批次的不同行一起推理
+                        （见 get_speech_probs_chunked），结果与逐窗口推理略有差异；默认1为逐窗口推理
+            execution_provider: ONNX模型的执行提供程序，cpu / openvino / coreml / cuda / dml，
+                                不可用时自动改用CPU
+            device: PyTorch模型（use_onnx=False）的推理设备，如 cpu / cuda / cuda:1；
+                    为None时有可用的CUDA则使用GPU，否则使用CPU。ONNX模型始终为cpu，
+                    GPU推理请改用 execution_provider='cuda'
         """
         if not SILERO_AVAILABLE:
             raise ImportError("Silero VAD不可用，请检查安装")
@@ -128,76 +549,289 @@ class VADProcessor:
         self.max_speech_duration_s = max_speech_duration_s
         self.min_silence_duration_ms = min_silence_duration_ms
         self.speech_pad_ms = speech_pad_ms
+        self.onnx_model_path = str(onnx_model_path) if onnx_model_path else None
+        self.intra_op_threads = intra_op_threads
+        self.batch_size = max(1, int(batch_size or 1))
+        self.execution_provider = execution_provider or 'cpu'
+        if use_onnx:
+            self.device = torch.device('cpu')
+        elif device is None:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        else:
+            self.device = torch.device(device)
         
         # 加载模型
-        print(f"加载Silero VAD模型 (ONNX: {use_onnx})...")
-        self.model = load_silero_vad(onnx=use_onnx)
-        print("模型加载成功")
+        if self.onnx_model_path:
+            if not use_onnx:
+                raise ValueError("onnx_model_path 需要同时设置 use_onnx=True")
+            if OnnxWrapper is None:
+                raise ImportError("当前silero-vad版本不支持加载自定义ONNX模型")
+            print(f"加载Silero VAD模型 (ONNX: {self.onnx_model_path})...")
+            self.model = OnnxWrapper(ort_model_path(self.onnx_model_path), force_onnx_cpu=True)
+        else:
+            print(f"加载Silero VAD模型 (ONNX: {use_onnx}, silero-vad {SILERO_VERSION})...")
+            if _major_version(SILERO_VERSION) < RECOMMENDED_SILERO_MAJOR:
+                warnings.warn(
+                    f"silero-vad {SILERO_VERSION} 自带的是旧版模型，"
+                    f"建议升级到{RECOMMENDED_SILERO_MAJOR}.x: pip install -U silero-vad"
+                )
+            self.model = load_silero_vad(onnx=use_onnx)
+            if not use_onnx:
+                self.model.to(self.device)
+        
+        # 指定了线程数或执行提供程序时按推理配置重新创建会话，
+        # 其余状态（RNN状态、采样率等）仍由OnnxWrapper管理
+        if use_onnx and (intra_op_threads or self.execution_provider != 'cpu'):
+            self.model.session = create_onnx_session(self.onnx_model_path or _bundled_onnx_model_path(),
+                                                     intra_op_threads, self.execution_provider)
+        print("模型加载成功" if self.device.type == 'cpu' else f"模型加载成功 (设备: {self.device})")
     
-    def detect_speech(self, audio_path, sampling_rate=16000, return_seconds=True):
+    def detect_speech(self, audio_path, sampling_rate=16000, return_seconds=True,
+                      threshold=None, min_speech_duration_ms=None,
+                      max_speech_duration_s=None, min_silence_duration_ms=None,
+                      return_array=False):
         """
         检测音频中的语音片段
         
         Args:
-            audio_path: 音频文件路径（wav格式，16kHz采样率）
+            audio_path: 音频文件路径（wav格式，16kHz采样率），
+                        或已解码的单声道音频数组（np.ndarray / torch.Tensor，采样率为sampling_rate）
             sampling_rate: 采样率，默认16000Hz
             return_seconds: 是否返回秒数（True）还是样本数（False）
+            threshold: 本次检测使用的阈值，为None时使用初始化时的配置
+            min_speech_duration_ms: 本次检测的最小语音持续时间，为None时使用初始化时的配置
+            max_speech_duration_s: 本次检测的最大语音持续时间，为None时使用初始化时的配置
+            min_silence_duration_ms: 本次检测的最小静音持续时间，为None时使用初始化时的配置
+            return_array: 是否返回 (N, 2) 数组而不是字典列表
             
         Returns:
             list: 语音时间戳列表
                 格式: [{'start': 0.5, 'end': 3.2}, {'start': 4.1, 'end': 7.8}, ...]
                 start和end单位为秒（如果return_seconds=True）
+            return_array=True 时为 (N, 2) 数组，每行为 [start, end]
+            （秒数为float64，样本数为int64）
         """
-        print(f"读取音频文件: {audio_path}")
-        
-        # 读取音频
-        wav = read_audio(audio_path, sampling_rate=sampling_rate)
+        if isinstance(audio_path, np.ndarray):
+            # 已在内存中的音频（如AudioExtractor.extract_audio_array的结果），无需读取文件
+            wav = torch.from_numpy(np.ascontiguousarray(audio_path, dtype=np.float32))
+        elif isinstance(audio_path, torch.Tensor):
+            wav = audio_path
+        else:
+            print(f"读取音频文件: {audio_path}")
+            
+            # 读取音频
+            wav = read_audio(audio_path, sampling_rate=sampling_rate)
         
         print(f"音频长度: {len(wav)/sampling_rate:.2f}秒")
         print("开始语音检测...")
         
         # 检测语音
-        speech_timestamps = get_speech_timestamps(
+        speech_timestamps = self.detect_speech_from_tensor(
             wav,
-            self.model,
-            threshold=self.threshold,
             sampling_rate=sampling_rate,
-            min_speech_duration_ms=self.min_speech_duration_ms,
-            max_speech_duration_s=self.max_speech_duration_s,
-            min_silence_duration_ms=self.min_silence_duration_ms,
-            speech_pad_ms=self.speech_pad_ms,
-            return_seconds=return_seconds
+            return_seconds=return_seconds,
+            threshold=threshold,
+            min_speech_duration_ms=min_speech_duration_ms,
+            max_speech_duration_s=max_speech_duration_s,
+            min_silence_duration_ms=min_silence_duration_ms,
+            return_array=return_array
         )
         
         print(f"检测到 {len(speech_timestamps)} 个语音片段")
         
         return speech_timestamps
     
-    def detect_speech_from_tensor(self, wav_tensor, sampling_rate=16000, return_seconds=True):
+    def detect_speech_from_tensor(self, wav_tensor, sampling_rate=16000, return_seconds=True,
+                                  threshold=None, min_speech_duration_ms=None,
+                                  max_speech_duration_s=None, min_silence_duration_ms=None,
+                                  return_array=False):
         """
         从音频张量检测语音片段
         
+        参数覆盖只作用于本次调用，同一个已加载的模型可以用不同参数反复检测
+        
         Args:
             wav_tensor: 音频张量 (torch.Tensor)
             sampling_rate: 采样率
             return_seconds: 是否返回秒数
+            threshold: 本次检测使用的阈值，为None时使用初始化时的配置
+            min_speech_duration_ms: 本次检测的最小语音持续时间，为None时使用初始化时的配置
+            max_speech_duration_s: 本次检测的最大语音持续时间，为None时使用初始化时的配置
+            min_silence_duration_ms: 本次检测的最小静音持续时间，为None时使用初始化时的配置
+            return_array: 是否返回 (N, 2) 数组而不是字典列表（见 timestamps_to_array）
             
         Returns:
-            list: 语音时间戳列表
+            list: 语音时间戳列表；return_array=True 时为 (N, 2) 数组
         """
-        speech_timestamps = get_speech_timestamps(
-            wav_tensor,
-            self.model,
-            threshold=self.threshold,
-            sampling_rate=sampling_rate,
-            min_speech_duration_ms=self.min_speech_duration_ms,
-            max_speech_duration_s=self.max_speech_duration_s,
-            min_silence_duration_ms=self.min_silence_duration_ms,
-            speech_pad_ms=self.speech_pad_ms,
-            return_seconds=return_seconds
-        )
+        wav_tensor = wav_tensor.to(self.device)
+        if self.batch_size > 1:
+            speech_probs, audio_length_samples = self.get_speech_probs_chunked(
+                wav_tensor, sampling_rate=sampling_rate, batch_size=self.batch_size)
+            speech_timestamps = probs_to_timestamps(
+                speech_probs, audio_length_samples,
+                threshold=self.threshold if threshold is None else threshold,
+                sampling_rate=sampling_rate,
+                min_speech_duration_ms=(self.min_speech_duration_ms if min_speech_duration_ms is None
+                                        else min_speech_duration_ms),
+                max_speech_duration_s=(self.max_speech_duration_s if max_speech_duration_s is None
+                                       else max_speech_duration_s),
+                min_silence_duration_ms=(self.min_silence_duration_ms if min_silence_duration_ms is None
+                                         else min_silence_duration_ms),
+                speech_pad_ms=self.speech_pad_ms,
+                return_seconds=return_seconds
+            )
+        else:
+            speech_timestamps = get_speech_timestamps(
+                wav_tensor,
+                self.model,
+                threshold=self.threshold if threshold is None else threshold,
+                sampling_rate=sampling_rate,
+                min_speech_duration_ms=(self.min_speech_duration_ms if min_speech_duration_ms is None
+                                        else min_speech_duration_ms),
+                max_speech_duration_s=(self.max_speech_duration_s if max_speech_duration_s is None
+                                       else max_speech_duration_s),
+                min_silence_duration_ms=(self.min_silence_duration_ms if min_silence_duration_ms is None
+                                         else min_silence_duration_ms),
+                speech_pad_ms=self.speech_pad_ms,
+                return_seconds=return_seconds
+            )
         
+        if return_array:
+            return timestamps_to_array(speech_timestamps,
+                                       dtype=np.float64 if return_seconds else np.int64)
         return speech_timestamps
+    
+    def get_speech_probs(self, audio_path, sampling_rate=16000):
+        """
+        计算音频中每个窗口的语音概率
+        
+        这是VAD中开销最大的模型推理部分，结果可以交给 probs_to_timestamps
+        用不同参数反复生成时间戳，而无需重新读取音频和运行模型
+        
+        Args:
+            audio_path: 音频文件路径
+            sampling_rate: 采样率，默认16000Hz
+            
+        Returns:
+            tuple: (语音概率数组 np.ndarray, 音频样本数)
+        """
+        wav = read_audio(audio_path, sampling_rate=sampling_rate)
+        return self.get_speech_probs_from_tensor(wav, sampling_rate=sampling_rate)
+    
+    def get_speech_probs_from_tensor(self, wav_tensor, sampling_rate=16000):
+        """
+        从音频张量计算每个窗口的语音概率
+        
+        Args:
+            wav_tensor: 音频张量 (torch.Tensor)
+            sampling_rate: 采样率
+            
+        Returns:
+            tuple: (语音概率数组 np.ndarray, 音频样本数)
+        """
+        window_size_samples = get_window_size_samples(sampling_rate)
+        wav_tensor = wav_tensor.to(self.device)
+        audio_length_samples = len(wav_tensor)
+        num_windows = math.ceil(audio_length_samples / window_size_samples)
+        speech_probs = np.empty(num_windows, dtype=np.float32)
+        
+        self.model.reset_states()
+        with torch.no_grad():
+            for i in range(num_windows):
+                start = i * window_size_samples
+                chunk = wav_tensor[start:start + window_size_samples]
+                if len(chunk) < window_size_samples:
+                    chunk = torch.nn.functional.pad(chunk, (0, window_size_samples - len(chunk)))
+                speech_probs[i] = self.model(chunk, sampling_rate).item()
+        
+        return speech_probs, audio_length_samples
+    
+    def get_speech_probs_batch(self, wav_tensors, sampling_rate=16000):
+        """
+        同时计算多段音频每个窗口的语音概率
+        
+        Silero VAD带有状态，同一段音频的窗口必须按顺序推理；但不同音频相互独立，
+        可以作为同一批次的不同行一起推理，每个时间步只需调用一次模型。
+        已结束的音频用静音补齐，多余窗口的结果会被丢弃
+        
+        Args:
+            wav_tensors: 音频张量列表 (torch.Tensor)
+            sampling_rate: 采样率
+            
+        Returns:
+            list: [(语音概率数组 np.ndarray, 音频样本数), ...]，与输入顺序一致
+        """
+        if not wav_tensors:
+            return []
+        
+        window_size_samples = get_window_size_samples(sampling_rate)
+        wav_tensors = [wav.to(self.device) for wav in wav_tensors]
+        lengths = [len(wav) for wav in wav_tensors]
+        num_windows = [math.ceil(n / window_size_samples) for n in lengths]
+        max_windows = max(num_windows)
+        speech_probs = np.empty((len(wav_tensors), max_windows), dtype=np.float32)
+        
+        self.model.reset_states()
+        with torch.no_grad():
+            for i in range(max_windows):
+                start = i * window_size_samples
+                rows = []
+                for wav in wav_tensors:
+                    chunk = wav[start:start + window_size_samples]
+                    if len(chunk) < window_size_samples:
+                        chunk = torch.nn.functional.pad(chunk, (0, window_size_samples - len(chunk)))
+                    rows.append(chunk)
+                out = self.model(torch.stack(rows), sampling_rate)
+                speech_probs[:, i] = out.reshape(-1).cpu().numpy()
+        
+        return [(speech_probs[i, :num_windows[i]].copy(), lengths[i])
+                for i in range(len(wav_tensors))]
+    
+    def get_speech_probs_chunked(self, wav_tensor, sampling_rate=16000, batch_size=8,
+                                 chunk_duration_s=120.0, overlap_s=30.0):
+        """
+        把一段长音频切成若干段，作为同一批次的不同行推理，计算每个窗口的语音概率
+        
+        每段从前一段末尾之前overlap_s秒处开始推理，重叠部分只用于让模型状态预热，
+        其概率被丢弃；因此除第一段外，结果与逐窗口推理（get_speech_probs_from_tensor）
+        略有差异。音频不超过一段时与逐窗口推理完全相同
+        
+        Args:
+            wav_tensor: 音频张量 (torch.Tensor)
+            sampling_rate: 采样率
+            batch_size: 每批同时推理的段数
+            chunk_duration_s: 每段输出的时长（秒）
+            overlap_s: 每段用于预热状态的重叠时长（秒）
+            
+        Returns:
+            tuple: (语音概率数组 np.ndarray, 音频样本数)
+        """
+        window_size_samples = get_window_size_samples(sampling_rate)
+        wav_tensor = wav_tensor.to(self.device)
+        audio_length_samples = len(wav_tensor)
+        num_windows = math.ceil(audio_length_samples / window_size_samples)
+        chunk_windows = max(1, round(chunk_duration_s * sampling_rate / window_size_samples))
+        overlap_windows = round(overlap_s * sampling_rate / window_size_samples)
+        
+        if batch_size <= 1 or num_windows <= chunk_windows:
+            return self.get_speech_probs_from_tensor(wav_tensor, sampling_rate=sampling_rate)
+        
+        # 每段的 (推理起始窗口, 输出起始窗口, 结束窗口)
+        chunks = []
+        for out_start in range(0, num_windows, chunk_windows):
+            chunks.append((max(0, out_start - overlap_windows), out_start,
+                           min(out_start + chunk_windows, num_windows)))
+        
+        speech_probs = np.empty(num_windows, dtype=np.float32)
+        for i in range(0, len(chunks), batch_size):
+            group = chunks[i:i + batch_size]
+            rows = [wav_tensor[start * window_size_samples:end * window_size_samples]
+                    for start, _, end in group]
+            for (start, out_start, end), (probs, _) in zip(
+                    group, self.get_speech_probs_batch(rows, sampling_rate=sampling_rate)):
+                speech_probs[out_start:end] = probs[out_start - start:]
+        
+        return speech_probs, audio_length_samples
 
 
 if __name__ == '__main__':